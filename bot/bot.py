@@ -16,9 +16,13 @@ from redis.asyncio import Redis
 from app.bot.classes.button_factory import ButtonFactory
 from app.bot.classes.dict_factory import DictFactory
 from app.bot.classes.identifier import Identifier
+from app.bot.classes.rate_limiter import RateLimiter
+from app.bot.classes.schema_migrator import SchemaMigrator
 from app.bot.classes.temp_message_manager import TempMessageManager
 from app.bot.middlewares.database import DatabaseMiddleware
 from app.bot.middlewares.identify import IdentifyMiddleware
+from app.bot.middlewares.rate_limit import RateLimitMiddleware
+from app.bot.migrations import create_migrations
 from app.bot.routers.start_command_router import start_command_router
 from app.bot.scenes.admin_scene import AdminScene
 from app.bot.scenes.announcement.announcement_group_scene import AnnouncementGroupScene
@@ -62,6 +66,8 @@ def create_dispatcher() -> Dispatcher:
         redis = Redis.from_url(str(config.redis_storage_dsn))
         storage = RedisStorage(redis, key_builder=DefaultKeyBuilder(with_destiny=True))
 
+    bot.session.middleware(RateLimitMiddleware(RateLimiter(redis)))
+
     new_dispatcher = Dispatcher(storage=storage)
 
     database: Database = create_db(str(config.postgresql_dsn))
@@ -102,6 +108,8 @@ def create_dispatcher() -> Dispatcher:
         }
     )
 
+    new_dispatcher.startup.register(SchemaMigrator(database, *create_migrations(config)).migrate)
+
     new_dispatcher.update.outer_middleware.register(DatabaseMiddleware(database))
     new_dispatcher.update.outer_middleware.register(IdentifyMiddleware(Identifier()))
     ConstI18nMiddleware(i18n=i18n, locale=config.locale).setup(new_dispatcher)
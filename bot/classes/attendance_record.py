@@ -0,0 +1,10 @@
+from datetime import datetime
+from typing import NamedTuple
+from uuid import UUID
+
+
+class AttendanceRecord(NamedTuple):
+    student_id: UUID
+    first_entry_at: datetime | None
+    arrival_type: str | None
+    has_excuse: bool
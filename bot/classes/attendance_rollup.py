@@ -0,0 +1,235 @@
+from datetime import time, date
+from typing import List, Sequence
+from uuid import UUID
+
+from sqlalchemy import (
+    Table, MetaData, Column, Index, Uuid, Date, DateTime, String, Boolean, Integer, Time, Select, Insert, Row,
+    select, delete, text, false, func, or_
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.database.models import Entry, Excuse
+
+rollup_metadata: MetaData = MetaData()
+
+rollup_table: Table = Table(
+    "attendance_rollup",
+    rollup_metadata,
+    Column("student_id", Uuid, primary_key=True),
+    Column("day", Date, primary_key=True),
+    Column("first_entry_at", DateTime(timezone=True)),
+    Column("arrival_type", String(16)),
+    Column("has_excuse", Boolean, nullable=False, server_default=false()),
+    Column("updated_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Index("ix_attendance_rollup_day_updated_at", "day", "updated_at")
+)
+
+# A single row with the timezone and school start time the entry trigger reads on every insert
+rollup_settings_table: Table = Table(
+    "attendance_rollup_settings",
+    rollup_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("timezone", String, nullable=False),
+    Column("start_time", Time, nullable=False)
+)
+
+
+class AttendanceRollup:
+    def __init__(
+            self,
+            *,
+            start_time: time,
+            timezone_name: str
+    ) -> None:
+        self.start_time: time = start_time
+        self.timezone_name: str = timezone_name
+
+    @staticmethod
+    async def install(connection: AsyncConnection) -> None:
+        entry_table: str = Entry.__tablename__
+        excuse_table: str = Excuse.__tablename__
+        rollup: str = rollup_table.name
+        rollup_settings: str = rollup_settings_table.name
+
+        await connection.run_sync(lambda sync_connection: rollup_metadata.create_all(sync_connection))
+
+        # Entries and excuses keep the rollup current from inside their own transaction,
+        # entries written before the settings row exists are picked up by the rebuild in configure
+        await connection.exec_driver_sql(
+            f"""
+            CREATE OR REPLACE FUNCTION update_{rollup}_entry() RETURNS trigger AS $$
+            DECLARE
+                current_settings {rollup_settings}%ROWTYPE;
+                local_time timestamp;
+            BEGIN
+                IF NEW.has_entered THEN
+                    SELECT * INTO current_settings FROM {rollup_settings} WHERE id = 1;
+
+                    IF FOUND THEN
+                        -- passing_time is a timestamptz, so a single AT TIME ZONE gives the local school time
+                        local_time := NEW.passing_time AT TIME ZONE current_settings.timezone;
+
+                        INSERT INTO {rollup} (student_id, day, first_entry_at, arrival_type, has_excuse)
+                        VALUES (
+                            NEW.student_id,
+                            local_time::date,
+                            NEW.passing_time,
+                            CASE WHEN local_time::time <= current_settings.start_time THEN 'PRESENT' ELSE 'LATE' END,
+                            EXISTS (
+                                SELECT 1 FROM {excuse_table}
+                                WHERE student_id = NEW.student_id AND date = local_time::date
+                            )
+                        )
+                        ON CONFLICT (student_id, day) DO UPDATE SET
+                            arrival_type = CASE
+                                WHEN {rollup}.first_entry_at IS NULL
+                                    OR EXCLUDED.first_entry_at < {rollup}.first_entry_at
+                                THEN EXCLUDED.arrival_type
+                                ELSE {rollup}.arrival_type
+                            END,
+                            first_entry_at = LEAST({rollup}.first_entry_at, EXCLUDED.first_entry_at),
+                            updated_at = now();
+                    END IF;
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        await connection.exec_driver_sql(
+            f"""
+            CREATE OR REPLACE FUNCTION update_{rollup}_excuse() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    -- A row without an entry or an excuse is kept, so snapshots reading by updated_at see the change
+                    UPDATE {rollup} SET
+                        has_excuse = EXISTS (
+                            SELECT 1 FROM {excuse_table}
+                            WHERE student_id = OLD.student_id AND date = OLD.date
+                        ),
+                        updated_at = now()
+                    WHERE student_id = OLD.student_id AND day = OLD.date;
+                END IF;
+
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO {rollup} (student_id, day, has_excuse)
+                    VALUES (NEW.student_id, NEW.date, TRUE)
+                    ON CONFLICT (student_id, day) DO UPDATE SET has_excuse = TRUE, updated_at = now();
+                END IF;
+
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        await connection.exec_driver_sql(
+            f"""
+            CREATE OR REPLACE TRIGGER {entry_table}_{rollup}
+            AFTER INSERT ON {entry_table}
+            FOR EACH ROW EXECUTE FUNCTION update_{rollup}_entry()
+            """
+        )
+        await connection.exec_driver_sql(
+            f"""
+            CREATE OR REPLACE TRIGGER {excuse_table}_{rollup}
+            AFTER INSERT OR UPDATE OR DELETE ON {excuse_table}
+            FOR EACH ROW EXECUTE FUNCTION update_{rollup}_excuse()
+            """
+        )
+
+    async def configure(
+            self,
+            connection: AsyncConnection
+    ) -> None:
+        query: Insert = insert(rollup_settings_table).values(
+            id=1,
+            timezone=self.timezone_name,
+            start_time=self.start_time
+        )
+
+        changed_id: int | None = await connection.scalar(
+            query.on_conflict_do_update(
+                index_elements=[rollup_settings_table.c.id],
+                set_={"timezone": query.excluded.timezone, "start_time": query.excluded.start_time},
+                where=or_(
+                    rollup_settings_table.c.timezone != query.excluded.timezone,
+                    rollup_settings_table.c.start_time != query.excluded.start_time
+                )
+            )
+            .returning(rollup_settings_table.c.id)
+        )
+
+        if changed_id is None:
+            return
+
+        # Days and arrival types written under the previous settings no longer match the config
+        await connection.execute(delete(rollup_table))
+        await self.backfill(connection)
+
+    async def backfill(
+            self,
+            connection: AsyncConnection
+    ) -> None:
+        local_time: str = "(passing_time AT TIME ZONE CAST(:timezone AS text))"
+
+        await connection.execute(
+            text(
+                f"""
+                INSERT INTO {rollup_table.name} (student_id, day, first_entry_at, arrival_type, has_excuse)
+                SELECT
+                    first_entries.student_id,
+                    first_entries.day,
+                    first_entries.first_entry_at,
+                    CASE
+                        WHEN first_entries.first_local_time::time <= CAST(:start_time AS time) THEN 'PRESENT'
+                        ELSE 'LATE'
+                    END,
+                    EXISTS (
+                        SELECT 1 FROM {Excuse.__tablename__}
+                        WHERE student_id = first_entries.student_id AND date = first_entries.day
+                    )
+                FROM (
+                    SELECT
+                        student_id,
+                        {local_time}::date AS day,
+                        min(passing_time) AS first_entry_at,
+                        min({local_time}) AS first_local_time
+                    FROM {Entry.__tablename__}
+                    WHERE has_entered
+                    GROUP BY student_id, {local_time}::date
+                ) AS first_entries
+                ON CONFLICT (student_id, day) DO UPDATE SET
+                    first_entry_at = EXCLUDED.first_entry_at,
+                    arrival_type = EXCLUDED.arrival_type,
+                    has_excuse = EXCLUDED.has_excuse,
+                    updated_at = now()
+                """
+            ),
+            {"timezone": self.timezone_name, "start_time": self.start_time.isoformat()}
+        )
+        await connection.execute(
+            text(
+                f"""
+                INSERT INTO {rollup_table.name} (student_id, day, has_excuse)
+                SELECT DISTINCT student_id, date, TRUE FROM {Excuse.__tablename__}
+                ON CONFLICT (student_id, day) DO NOTHING
+                """
+            )
+        )
+
+    @staticmethod
+    async def get_attendance(
+            db: AsyncSession,
+            date_range: List[date],
+            student_ids: List[UUID]
+    ) -> Sequence[Row]:
+        query: Select = (
+            select(rollup_table)
+            .filter(
+                rollup_table.c.day.in_(date_range),
+                rollup_table.c.student_id.in_(student_ids)
+            )
+        )
+
+        return (await db.execute(query)).all()
@@ -0,0 +1,146 @@
+import asyncio
+import time
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Dict, List, Tuple, Sequence
+from uuid import UUID
+
+from pyuca import Collator
+from sqlalchemy import Select, select, true
+from sqlalchemy.orm import joinedload
+
+from app.bot.classes.attendance_record import AttendanceRecord
+from app.bot.classes.attendance_rollup import rollup_table
+from app.bot.classes.group_attendance import GroupAttendance
+from app.bot.enums.account_type import AccountType
+from app.database.database import Database
+from app.database.models import Account, Settings, Role, Group, Student
+
+collator: Collator = Collator()
+
+
+class AttendanceSnapshot:
+    def __init__(
+            self,
+            database: Database,
+            current_timezone: tzinfo,
+            *,
+            refresh_delay: float = 15,
+            refresh_overlap: timedelta = timedelta(seconds=30)
+    ) -> None:
+        self.database: Database = database
+        self.current_timezone: tzinfo = current_timezone
+        self.refresh_delay: float = refresh_delay
+        self.refresh_overlap: timedelta = refresh_overlap
+
+        self.day: date | None = None
+        self.groups: List[Group] = []
+        self.students: Dict[UUID, List[Tuple[UUID, str]]] = {}
+        self.records: Dict[UUID, AttendanceRecord] = {}
+        self.watermark: datetime | None = None
+        self.refreshed_at: float = 0
+        self.lock: asyncio.Lock = asyncio.Lock()
+
+    async def get_group_attendances(self) -> List[GroupAttendance]:
+        await self.refresh()
+
+        group_attendances: List[GroupAttendance] = []
+
+        for group in self.groups:
+            present: List[str] = []
+            late: List[Tuple[str, datetime]] = []
+            absent: List[str] = []
+
+            for student_id, full_name in self.students.get(group.id, []):
+                record: AttendanceRecord | None = self.records.get(student_id)
+
+                if record is None or record.first_entry_at is None:
+                    if record is None or not record.has_excuse:
+                        absent.append(full_name)
+                    continue
+
+                present.append(full_name)
+
+                if record.arrival_type == "LATE" and not record.has_excuse:
+                    late.append((full_name, record.first_entry_at.astimezone(self.current_timezone)))
+
+            group_attendances.append(
+                GroupAttendance(
+                    group=group,
+                    present=sorted(present, key=collator.sort_key),
+                    late=sorted(late, key=lambda student: student[1]),
+                    absent=sorted(absent, key=collator.sort_key)
+                )
+            )
+
+        return group_attendances
+
+    async def refresh(self) -> None:
+        # Both log schedulers share one refresh instead of each querying the day's entries per group
+        async with self.lock:
+            today: date = datetime.now(self.current_timezone).date()
+
+            if self.day != today:
+                await self.__load_groups()
+
+                self.day = today
+                self.records = {}
+                self.watermark = None
+                self.refreshed_at = 0
+
+            if time.monotonic() - self.refreshed_at < self.refresh_delay:
+                return
+
+            query: Select = (
+                select(
+                    rollup_table.c.student_id,
+                    rollup_table.c.first_entry_at,
+                    rollup_table.c.arrival_type,
+                    rollup_table.c.has_excuse,
+                    rollup_table.c.updated_at
+                )
+                .filter(rollup_table.c.day == today)
+            )
+
+            # Only rows changed since the previous refresh are read, the overlap covers late committing transactions
+            if self.watermark is not None:
+                query = query.filter(rollup_table.c.updated_at > self.watermark - self.refresh_overlap)
+
+            async with self.database.session_maker() as db:
+                for student_id, first_entry_at, arrival_type, has_excuse, updated_at in (await db.execute(query)).all():
+                    self.records[student_id] = AttendanceRecord(student_id, first_entry_at, arrival_type, has_excuse)
+
+                    if self.watermark is None or updated_at > self.watermark:
+                        self.watermark = updated_at
+
+            self.refreshed_at = time.monotonic()
+
+    async def __load_groups(self) -> None:
+        # The supervised groups and their students are loaded once a day
+        async with self.database.session_maker() as db:
+            groups: Sequence[Group] = (
+                await db.execute(
+                    select(Group)
+                    .join(Account)
+                    .filter(Account.telegram_id.is_not(None))
+                    .join(Settings)
+                    .filter(Settings.send_bot_messages.is_(true()))
+                    .join(Role)
+                    .filter_by(account_type=AccountType.SUPERVISOR.name)
+                    .options(joinedload(Group.supervisor).joinedload(Account.settings))
+                )
+            ).unique().scalars().all()
+
+            students: Sequence[Tuple[UUID, UUID, str]] = (
+                await db.execute(
+                    select(Group.id, Student.id, Student.full_name)
+                    .select_from(Student)
+                    .join(Group)
+                    .filter(Group.id.in_([group.id for group in groups]))
+                )
+            ).all()
+
+        self.groups = list(groups)
+        self.students = {}
+
+        for group_id, student_id, full_name in students:
+            self.students.setdefault(group_id, []).append((student_id, full_name))
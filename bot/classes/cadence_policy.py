@@ -0,0 +1,52 @@
+from datetime import time, tzinfo, datetime
+from typing import List, Tuple
+
+from pytz import utc
+
+
+class CadencePolicy:
+    def __init__(
+            self,
+            *,
+            min_delay: float = 1,
+            peak_delay: float = 3,
+            max_delay: float = 120,
+            backoff_factor: float = 2,
+            peak_windows: List[Tuple[time, time]] | None = None,
+            current_timezone: tzinfo = utc
+    ) -> None:
+        self.min_delay: float = min_delay
+        self.peak_delay: float = peak_delay
+        self.max_delay: float = max_delay
+        self.backoff_factor: float = backoff_factor
+        self.peak_windows: List[Tuple[time, time]] = peak_windows if peak_windows is not None else []
+        self.current_timezone: tzinfo = current_timezone
+
+        self.delay: float = min_delay
+
+    def get_delay(
+            self,
+            found_work: bool
+    ) -> float:
+        if found_work:
+            self.delay = self.min_delay
+        else:
+            self.delay = min(self.max_delay, self.delay * self.backoff_factor)
+
+        if self.is_peak(datetime.now(self.current_timezone).time()):
+            return min(self.delay, self.peak_delay)
+
+        return self.delay
+
+    def is_peak(
+            self,
+            current_time: time
+    ) -> bool:
+        for start_time, end_time in self.peak_windows:
+            if start_time <= end_time:
+                if start_time <= current_time < end_time:
+                    return True
+            elif current_time >= start_time or current_time < end_time:
+                return True
+
+        return False
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import List
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+RENEW_SCRIPT: str = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class Cluster:
+    def __init__(
+            self,
+            redis: Redis | None = None,
+            *,
+            name: str = "scheduler",
+            instance_id: str | None = None,
+            lease_time: float = 30,
+            heartbeat_delay: float = 10
+    ) -> None:
+        self.redis: Redis | None = redis
+        self.name: str = name
+        self.instance_id: str = instance_id if instance_id is not None else f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_time: float = lease_time
+        self.heartbeat_delay: float = heartbeat_delay
+
+        self.leader_until: float = 0
+        self.shard_index: int = 0
+        self.shard_count: int = 1
+
+    @property
+    def is_leader(self) -> bool:
+        if self.redis is None:
+            return True
+
+        return self.leader_until > time.monotonic()
+
+    async def run(self) -> None:
+        if self.redis is None:
+            return
+
+        while True:
+            try:
+                await self.heartbeat()
+            except RedisError as e:
+                logging.getLogger("scheduler").error(f"Cluster heartbeat of {self.instance_id} failed. Error: {e}")
+
+            await asyncio.sleep(self.heartbeat_delay)
+
+    async def heartbeat(self) -> None:
+        started_at: float = time.monotonic()
+        lease_time: int = int(self.lease_time * 1000)
+        leader_key: str = f"{self.name}:leader"
+        members_key: str = f"{self.name}:members"
+
+        was_leader: bool = self.is_leader
+        is_leader: bool = False
+
+        if was_leader:
+            is_leader = bool(await self.redis.eval(RENEW_SCRIPT, 1, leader_key, self.instance_id, lease_time))
+
+        if not is_leader:
+            is_leader = bool(await self.redis.set(leader_key, self.instance_id, nx=True, px=lease_time))
+
+        self.leader_until = started_at + self.lease_time if is_leader else 0
+
+        if is_leader != was_leader:
+            logging.getLogger("scheduler").info(
+                f"Instance {self.instance_id} {'became' if is_leader else 'is no longer'} the scheduler leader"
+            )
+
+        now: float = time.time()
+
+        async with self.redis.pipeline(transaction=True) as pipeline:
+            pipeline.zadd(members_key, {self.instance_id: now})
+            pipeline.zremrangebyscore(members_key, 0, now - self.lease_time)
+            pipeline.zrange(members_key, 0, -1)
+            *_, members = await pipeline.execute()
+
+        # Members are scored by their last heartbeat, so the shard index is taken from a stable order instead
+        instance_ids: List[str] = sorted(
+            member.decode("utf-8") if isinstance(member, bytes) else member
+            for member in members
+        )
+
+        self.shard_count = len(instance_ids)
+        self.shard_index = instance_ids.index(self.instance_id)
@@ -0,0 +1,108 @@
+import time
+from types import NoneType
+from typing import Dict, Any, Type, Tuple
+
+from redis.asyncio import Redis
+
+CLAIM_SCRIPT: str = """
+local owner = redis.call('GET', KEYS[1])
+if not owner then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    return 1
+end
+if owner == ARGV[1] then
+    return 1
+end
+return 0
+"""
+
+RELEASE_SCRIPT: str = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class Deduplicator:
+    def __init__(
+            self,
+            redis: Redis | None = None,
+            *,
+            ttl: int = 2 * 24 * 60 * 60
+    ) -> None:
+        self.redis: Redis | None = redis
+        self.ttl: int = ttl
+        self.claims: Dict[str, Tuple[str, float]] = {}
+        self.swept_at: float = time.monotonic()
+
+        self.deduplicator_strategy_dict: Dict[Type[Redis] | NoneType, dict[str, Any]] = {
+            Redis: {
+                "claim": self.__claim_in_redis,
+                "release": self.__release_in_redis
+            },
+            NoneType: {
+                "claim": self.__claim_in_memory,
+                "release": self.__release_in_memory
+            }
+        }
+
+    async def claim(
+            self,
+            key: str,
+            owner: str
+    ) -> bool:
+        return await self.deduplicator_strategy_dict[type(self.redis)]["claim"](key, owner)
+
+    async def release(
+            self,
+            key: str,
+            owner: str
+    ) -> None:
+        await self.deduplicator_strategy_dict[type(self.redis)]["release"](key, owner)
+
+    async def __claim_in_memory(
+            self,
+            key: str,
+            owner: str
+    ) -> bool:
+        now: float = time.monotonic()
+        claim: Tuple[str, float] | None = self.claims.get(key)
+
+        if claim is not None and claim[1] > now and claim[0] != owner:
+            return False
+
+        if claim is None or claim[1] <= now:
+            self.claims[key] = (owner, now + self.ttl)
+
+        if self.swept_at + 600 < now:
+            self.swept_at = now
+            self.claims = {
+                claim_key: claim_value for claim_key, claim_value in self.claims.items() if claim_value[1] > now
+            }
+
+        return True
+
+    async def __release_in_memory(
+            self,
+            key: str,
+            owner: str
+    ) -> None:
+        claim: Tuple[str, float] | None = self.claims.get(key)
+
+        if claim is not None and claim[0] == owner:
+            self.claims.pop(key)
+
+    async def __claim_in_redis(
+            self,
+            key: str,
+            owner: str
+    ) -> bool:
+        return bool(await self.redis.eval(CLAIM_SCRIPT, 1, f"dedup:{key}", owner, self.ttl))
+
+    async def __release_in_redis(
+            self,
+            key: str,
+            owner: str
+    ) -> None:
+        await self.redis.eval(RELEASE_SCRIPT, 1, f"dedup:{key}", owner)
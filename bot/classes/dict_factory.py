@@ -57,6 +57,10 @@ class DictFactory:
                 BoolSetting.ALLOW_VARIATIONS: {
                     True: __("button.settings.allow_variations.1").value,
                     False: __("button.settings.allow_variations.0").value
+                },
+                BoolSetting.NIGHT_DIGEST: {
+                    True: __("button.settings.night_digest.1").value,
+                    False: __("button.settings.night_digest.0").value
                 }
             }
 
@@ -70,6 +74,10 @@ class DictFactory:
                 BoolSetting.ALLOW_VARIATIONS: {
                     True: __("answer.settings.allow_variations.1").value,
                     False: __("answer.settings.allow_variations.0").value
+                },
+                BoolSetting.NIGHT_DIGEST: {
+                    True: __("answer.settings.night_digest.1").value,
+                    False: __("answer.settings.night_digest.0").value
                 }
             }
 
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from typing import Callable, Awaitable, Any
+
+import asyncpg
+from asyncpg import Connection
+from sqlalchemy import make_url
+
+ENTRY_CREATED_CHANNEL: str = "entry_created"
+
+
+class EntryListener:
+    def __init__(
+            self,
+            dsn: str,
+            *,
+            channel: str = ENTRY_CREATED_CHANNEL,
+            health_check_delay: float = 30,
+            reconnect_delay: float = 5
+    ) -> None:
+        # asyncpg takes a plain postgresql URL without the SQLAlchemy driver suffix
+        self.dsn: str = make_url(dsn).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel: str = channel
+        self.health_check_delay: float = health_check_delay
+        self.reconnect_delay: float = reconnect_delay
+
+        self.event: asyncio.Event = asyncio.Event()
+
+    async def listen(
+            self,
+            callback: Callable[[], Awaitable[Any]]
+    ) -> None:
+        logger: logging.Logger = logging.getLogger("scheduler")
+
+        while True:
+            try:
+                connection: Connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.error(f"Entry listener could not connect to the database. Error: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            try:
+                await connection.add_listener(self.channel, self.__on_notification)
+                logger.info(f"Entry listener is listening on {self.channel}")
+
+                # Entries inserted while the listener was disconnected have not been announced
+                self.event.set()
+
+                while not connection.is_closed():
+                    try:
+                        await asyncio.wait_for(self.event.wait(), self.health_check_delay)
+                    except asyncio.TimeoutError:
+                        await connection.execute("SELECT 1")
+                        continue
+
+                    self.event.clear()
+
+                    try:
+                        await callback()
+                    except Exception as e:
+                        logger.error(f"Entry listener callback raised an exception. Error: {e}")
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.error(f"Entry listener lost the database connection. Error: {e}")
+            finally:
+                if not connection.is_closed():
+                    await connection.close()
+
+            await asyncio.sleep(self.reconnect_delay)
+
+    def __on_notification(
+            self,
+            connection: Connection,
+            pid: int,
+            channel: str,
+            payload: str
+    ) -> None:
+        self.event.set()
@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import NamedTuple
+from uuid import UUID
+
+
+class EntryNotification(NamedTuple):
+    entry_id: UUID
+    created_at: datetime
+    passing_time: datetime
+    has_entered: bool
+    student_id: UUID
+    student_full_name: str
+    telegram_id: int
+    parent_full_name: str
+    allow_variations: bool
+    night_digest: bool
@@ -0,0 +1,11 @@
+from datetime import datetime
+from typing import NamedTuple, List, Tuple
+
+from app.database.models import Group
+
+
+class GroupAttendance(NamedTuple):
+    group: Group
+    present: List[str]
+    late: List[Tuple[str, datetime]]
+    absent: List[str]
@@ -0,0 +1,10 @@
+from typing import NamedTuple, Callable, Awaitable
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+class Migration(NamedTuple):
+    name: str
+    apply: Callable[[AsyncConnection], Awaitable[None]]
+    is_transactional: bool = True
+    is_repeatable: bool = False
@@ -0,0 +1,83 @@
+from typing import List, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import (
+    Table, MetaData, Column, Uuid, BigInteger, String, DateTime, Boolean, Select, Row, select, delete, tuple_
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bot.classes.entry_notification import EntryNotification
+from app.database.database import Database
+
+digest_table: Table = Table(
+    "night_digest_entries",
+    MetaData(),
+    Column("entry_id", Uuid, primary_key=True),
+    Column("telegram_id", BigInteger, primary_key=True),
+    Column("parent_full_name", String, nullable=False),
+    Column("student_full_name", String, nullable=False),
+    Column("passing_time", DateTime(timezone=True), nullable=False),
+    Column("has_entered", Boolean, nullable=False)
+)
+
+
+class NightDigestBuffer:
+    def __init__(
+            self,
+            database: Database
+    ) -> None:
+        self.database: Database = database
+
+    async def add(
+            self,
+            db: AsyncSession,
+            notifications: List[EntryNotification]
+    ) -> None:
+        if len(notifications) == 0:
+            return
+
+        await db.execute(
+            insert(digest_table).on_conflict_do_nothing(),
+            [
+                {
+                    "entry_id": notification.entry_id,
+                    "telegram_id": notification.telegram_id,
+                    "parent_full_name": notification.parent_full_name,
+                    "student_full_name": notification.student_full_name,
+                    "passing_time": notification.passing_time,
+                    "has_entered": notification.has_entered
+                }
+                for notification in notifications
+            ]
+        )
+
+    async def get_entries(self) -> Sequence[Row]:
+        query: Select = (
+            select(
+                digest_table.c.entry_id,
+                digest_table.c.telegram_id,
+                digest_table.c.parent_full_name,
+                digest_table.c.student_full_name,
+                digest_table.c.passing_time,
+                digest_table.c.has_entered
+            )
+            .order_by(digest_table.c.passing_time)
+        )
+
+        async with self.database.session_maker() as db:
+            return (await db.execute(query)).all()
+
+    async def remove(
+            self,
+            keys: List[Tuple[UUID, int]]
+    ) -> None:
+        if len(keys) == 0:
+            return
+
+        async with self.database.session_maker() as db:
+            await db.execute(
+                delete(digest_table)
+                .filter(tuple_(digest_table.c.entry_id, digest_table.c.telegram_id).in_(keys))
+            )
+            await db.commit()
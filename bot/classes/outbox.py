@@ -0,0 +1,240 @@
+import logging
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Sequence, Set
+from uuid import uuid4, UUID
+
+from aiogram.types import BufferedInputFile
+from pytz import utc
+from sqlalchemy import (
+    Table, MetaData, Column, Uuid, SmallInteger, DateTime, String, LargeBinary, Index, Select, Update, Row,
+    select, update, insert, delete, text, exists, any_
+)
+from sqlalchemy.dialects.postgresql import JSONB, ARRAY, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bot.classes.schedule_task import ScheduleTask
+from app.bot.notifiers.abstract_notifier import AbstractNotifier
+from app.database.database import Database
+
+outbox_metadata: MetaData = MetaData()
+
+outbox_table: Table = Table(
+    "notification_outbox",
+    outbox_metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("payload", JSONB, nullable=False),
+    Column("priority", SmallInteger, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("available_at", DateTime(timezone=True), nullable=False),
+    Column("delivered_at", DateTime(timezone=True)),
+    Column("document_ids", ARRAY(String(64)), nullable=False, server_default="{}"),
+    Index(
+        "ix_notification_outbox_pending",
+        "priority",
+        "available_at",
+        postgresql_where=text("delivered_at IS NULL")
+    )
+)
+
+document_table: Table = Table(
+    "notification_outbox_document",
+    outbox_metadata,
+    Column("id", String(64), primary_key=True),
+    Column("filename", String, nullable=False),
+    Column("data", LargeBinary, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False)
+)
+
+
+class Outbox:
+    def __init__(
+            self,
+            database: Database,
+            notifiers: List[AbstractNotifier],
+            *,
+            lease_time: float = 900,
+            poll_delay: float = 1,
+            retention: timedelta = timedelta(days=2)
+    ) -> None:
+        self.database: Database = database
+        self.notifiers: Dict[str, AbstractNotifier] = {
+            notifier.notify_method_name: notifier for notifier in notifiers
+        }
+
+        self.lease_time: float = lease_time
+        self.poll_delay: float = poll_delay
+        self.retention: timedelta = retention
+        self.purged_at: datetime = datetime.now(utc)
+
+    async def add(
+            self,
+            db: AsyncSession,
+            tasks: List[ScheduleTask]
+    ) -> None:
+        if len(tasks) == 0:
+            return
+
+        now: datetime = datetime.now(utc)
+        rows: List[Dict[str, Any]] = []
+        documents: Dict[str, Dict[str, Any]] = {}
+
+        for task in tasks:
+            task.outbox_id = uuid4()
+            document_ids: List[str] = []
+
+            for document in task.documents:
+                document_id: str = ScheduleTask.get_document_id(document)
+                document_ids.append(document_id)
+                documents[document_id] = {
+                    "id": document_id,
+                    "filename": document.filename,
+                    "data": document.data,
+                    "created_at": now
+                }
+
+            rows.append(
+                {
+                    "id": task.outbox_id,
+                    "payload": task.to_payload(),
+                    "priority": task.priority.value,
+                    "created_at": now,
+                    "available_at": now,
+                    "document_ids": document_ids
+                }
+            )
+
+        # A report sent to many recipients is written once and referenced by each of their rows
+        if documents:
+            await db.execute(
+                pg_insert(document_table).on_conflict_do_nothing(index_elements=[document_table.c.id]),
+                list(documents.values())
+            )
+
+        await db.execute(insert(outbox_table), rows)
+
+    async def add_tasks(
+            self,
+            tasks: List[ScheduleTask]
+    ) -> None:
+        async with self.database.session_maker() as db:
+            await self.add(db, tasks)
+            await db.commit()
+
+    async def claim(
+            self,
+            count: int
+    ) -> List[ScheduleTask]:
+        now: datetime = datetime.now(utc)
+
+        pending: Select = (
+            select(outbox_table.c.id)
+            .filter(
+                outbox_table.c.delivered_at.is_(None),
+                outbox_table.c.available_at <= now
+            )
+            .order_by(outbox_table.c.priority, outbox_table.c.created_at)
+            .limit(count)
+            .with_for_update(skip_locked=True)
+        )
+
+        # A claimed row stays hidden from other senders until its lease runs out
+        query: Update = (
+            update(outbox_table)
+            .where(outbox_table.c.id.in_(pending))
+            .values(available_at=now + timedelta(seconds=self.lease_time))
+            .returning(outbox_table.c.id, outbox_table.c.payload, outbox_table.c.document_ids)
+        )
+
+        tasks: List[ScheduleTask] = []
+
+        async with self.database.session_maker() as db:
+            rows: Sequence[Row] = (await db.execute(query)).all()
+            documents: Dict[str, BufferedInputFile] = await self.__load_documents(
+                db,
+                {document_id for _, _, document_ids in rows for document_id in document_ids}
+            )
+
+            for outbox_id, payload, _ in rows:
+                try:
+                    task: ScheduleTask = ScheduleTask.from_payload(payload, self.notifiers, documents)
+                except (KeyError, ValueError, TypeError, AttributeError) as e:
+                    logging.getLogger("scheduler").error(f"Dropped malformed outbox task {outbox_id}. Error: {e}")
+                    await db.execute(self.__mark_delivered(outbox_id))
+                    continue
+
+                task.outbox_id = outbox_id
+                tasks.append(task)
+
+            await db.commit()
+
+        return tasks
+
+    async def acknowledge(
+            self,
+            outbox_id: UUID
+    ) -> None:
+        async with self.database.session_maker() as db:
+            await db.execute(self.__mark_delivered(outbox_id))
+            await db.commit()
+
+    async def postpone(
+            self,
+            outbox_id: UUID,
+            delay: float
+    ) -> None:
+        # A task waiting for its retry keeps the lease so other senders do not claim it meanwhile
+        async with self.database.session_maker() as db:
+            await db.execute(
+                update(outbox_table)
+                .filter(outbox_table.c.id == outbox_id)
+                .values(available_at=datetime.now(utc) + timedelta(seconds=delay + self.lease_time))
+            )
+            await db.commit()
+
+    async def purge(self) -> None:
+        now: datetime = datetime.now(utc)
+
+        if now - self.purged_at < timedelta(minutes=10):
+            return
+
+        self.purged_at = now
+
+        async with self.database.session_maker() as db:
+            await db.execute(
+                delete(outbox_table)
+                .filter(outbox_table.c.delivered_at < now - self.retention)
+            )
+            await db.execute(
+                delete(document_table)
+                .filter(
+                    document_table.c.created_at < now - self.retention,
+                    ~exists().where(document_table.c.id == any_(outbox_table.c.document_ids))
+                )
+            )
+            await db.commit()
+
+    @staticmethod
+    async def __load_documents(
+            db: AsyncSession,
+            document_ids: Set[str]
+    ) -> Dict[str, BufferedInputFile]:
+        if not document_ids:
+            return {}
+
+        query: Select = (
+            select(document_table.c.id, document_table.c.filename, document_table.c.data)
+            .filter(document_table.c.id.in_(document_ids))
+        )
+
+        return {
+            document_id: BufferedInputFile(data, filename)
+            for document_id, filename, data in (await db.execute(query)).all()
+        }
+
+    @staticmethod
+    def __mark_delivered(outbox_id: UUID) -> Update:
+        return (
+            update(outbox_table)
+            .filter(outbox_table.c.id == outbox_id)
+            .values(delivered_at=datetime.now(utc))
+        )
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from types import NoneType
+from typing import Dict, Any, Type
+
+from redis.asyncio import Redis
+
+ACQUIRE_SCRIPT: str = """
+local pause = redis.call('PTTL', KEYS[2])
+if pause > 0 then
+    return pause
+end
+
+local now = redis.call('TIME')
+now = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+
+if tat < now then
+    tat = now
+end
+
+if tat - now > tolerance then
+    return tat - now - tolerance
+end
+
+redis.call('SET', KEYS[1], tat + interval, 'PX', tolerance + interval)
+return 0
+"""
+
+
+class RateLimiter:
+    def __init__(
+            self,
+            redis: Redis | None = None,
+            *,
+            global_rate: float = 30,
+            chat_rate: float = 1,
+            group_rate: float = 20 / 60,
+            burst: int = 3
+    ) -> None:
+        self.redis: Redis | None = redis
+
+        self.global_interval: float = 1 / global_rate
+        self.chat_interval: float = 1 / chat_rate
+        self.group_interval: float = 1 / group_rate
+        self.burst: int = burst
+
+        self.theoretical_times: Dict[str, float] = {}
+        self.paused_until: float = 0
+
+        self.limiter_strategy_dict: Dict[Type[Redis] | NoneType, dict[str, Any]] = {
+            Redis: {
+                "acquire": self.__acquire_from_redis,
+                "pause": self.__pause_in_redis
+            },
+            NoneType: {
+                "acquire": self.__acquire_from_memory,
+                "pause": self.__pause_in_memory
+            }
+        }
+
+    async def acquire(
+            self,
+            chat_id: int | str | None = None
+    ) -> None:
+        if chat_id is not None:
+            if isinstance(chat_id, int) and chat_id > 0:
+                await self.__wait(f"rate:chat:{chat_id}", self.chat_interval)
+            else:
+                await self.__wait(f"rate:chat:{chat_id}", self.group_interval)
+
+        await self.__wait("rate:global", self.global_interval)
+
+    async def pause(
+            self,
+            retry_after: float
+    ) -> None:
+        await self.limiter_strategy_dict[type(self.redis)]["pause"](retry_after)
+
+    async def __wait(
+            self,
+            key: str,
+            interval: float
+    ) -> None:
+        while True:
+            delay: float = await self.limiter_strategy_dict[type(self.redis)]["acquire"](key, interval)
+
+            if delay <= 0:
+                return
+
+            await asyncio.sleep(delay)
+
+    async def __acquire_from_memory(
+            self,
+            key: str,
+            interval: float
+    ) -> float:
+        now: float = time.monotonic()
+
+        if self.paused_until > now:
+            return self.paused_until - now
+
+        tolerance: float = interval * (self.burst - 1)
+        theoretical_time: float = max(self.theoretical_times.get(key, now), now)
+
+        if theoretical_time - now > tolerance:
+            return theoretical_time - now - tolerance
+
+        self.theoretical_times[key] = theoretical_time + interval
+        return 0
+
+    async def __pause_in_memory(
+            self,
+            retry_after: float
+    ) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    async def __acquire_from_redis(
+            self,
+            key: str,
+            interval: float
+    ) -> float:
+        delay: int = await self.redis.eval(
+            ACQUIRE_SCRIPT,
+            2,
+            key,
+            "rate:pause",
+            int(interval * 1000),
+            int(interval * (self.burst - 1) * 1000)
+        )
+
+        return delay / 1000
+
+    async def __pause_in_redis(
+            self,
+            retry_after: float
+    ) -> None:
+        await self.redis.set("rate:pause", 1, px=int(retry_after * 1000))
@@ -0,0 +1,144 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import time, date
+from functools import partial
+from typing import List, Dict, Any, Callable, Coroutine, Tuple
+from uuid import UUID
+
+from aiogram.utils.i18n import I18n
+from pytz import timezone
+
+from app.database.database import create_db, Database
+from app.services.config import Config
+from app.statistics.antirating_creator import AntiRatingCreator
+from app.statistics.models.antirating_report_model import AntiRatingReportModel
+from app.statistics.models.statistics_report_model import StatisticsReportModel
+from app.statistics.statistics_creator import StatisticsCreator
+
+# Every pool process keeps its own event loop, database engine and creators between renders
+worker_state: Dict[str, Any] = {}
+
+
+def initialize_worker() -> None:
+    config: Config = Config(_env_file=".env")
+    database: Database = create_db(str(config.postgresql_dsn))
+    i18n: I18n = I18n(path=config.locale_path, default_locale=config.locale, domain=config.domain)
+
+    worker_state["loop"] = asyncio.new_event_loop()
+    worker_state["statistics_creator"] = StatisticsCreator(database, i18n, timezone(config.timezone))
+    worker_state["antirating_creator"] = AntiRatingCreator(database, i18n, timezone(config.timezone))
+
+
+def run_in_worker(
+        creator_name: str,
+        method_name: str,
+        *args: Any,
+        **kwargs: Any
+) -> Any:
+    method: Callable[..., Coroutine[Any, Any, Any]] = getattr(worker_state[creator_name], method_name)
+
+    return worker_state["loop"].run_until_complete(method(*args, **kwargs))
+
+
+def run_batch_in_worker(
+        creator_name: str,
+        method_name: str,
+        args: Tuple[Any, ...],
+        batch_kwargs: Dict[Any, Dict[str, Any]]
+) -> Dict[Any, Any | Exception]:
+    method: Callable[..., Coroutine[Any, Any, Any]] = getattr(worker_state[creator_name], method_name)
+
+    async def run_batch() -> Dict[Any, Any | Exception]:
+        results: Dict[Any, Any | Exception] = {}
+
+        # A failed call is returned in place of its result so the rest of the batch is still delivered
+        for key, kwargs in batch_kwargs.items():
+            try:
+                results[key] = await method(*args, **kwargs)
+            except Exception as e:
+                results[key] = e
+
+        return results
+
+    return worker_state["loop"].run_until_complete(run_batch())
+
+
+class ReportRenderer:
+    def __init__(
+            self,
+            *,
+            pool_size: int = 2
+    ) -> None:
+        self.pool_size: int = pool_size
+        self.executor: ProcessPoolExecutor = ProcessPoolExecutor(
+            max_workers=pool_size,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=initialize_worker
+        )
+
+    async def create_statistics(
+            self,
+            start_time: time
+    ) -> StatisticsReportModel:
+        return await self.__render("statistics_creator", "create_statistics", start_time)
+
+    async def create_antirating(
+            self,
+            start_time: time,
+            amount: int,
+            date_range: List[date]
+    ) -> AntiRatingReportModel:
+        return await self.__render("antirating_creator", "create_antirating", start_time, amount, date_range)
+
+    async def create_group_antirating(
+            self,
+            start_time: time,
+            amount: int,
+            date_range: List[date],
+            *,
+            group_id: UUID,
+            group_name: str
+    ) -> AntiRatingReportModel:
+        return await self.__render(
+            "antirating_creator",
+            "create_group_antirating",
+            start_time,
+            amount,
+            date_range,
+            group_id=group_id,
+            group_name=group_name
+        )
+
+    async def create_group_antiratings(
+            self,
+            start_time: time,
+            amount: int,
+            date_range: List[date],
+            groups: Dict[UUID, str]
+    ) -> Dict[UUID, AntiRatingReportModel | Exception]:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            partial(
+                run_batch_in_worker,
+                "antirating_creator",
+                "create_group_antirating",
+                (start_time, amount, date_range),
+                {group_id: {"group_id": group_id, "group_name": group_name} for group_id, group_name in groups.items()}
+            )
+        )
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __render(
+            self,
+            creator_name: str,
+            method_name: str,
+            *args: Any,
+            **kwargs: Any
+    ) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            partial(run_in_worker, creator_name, method_name, *args, **kwargs)
+        )
@@ -0,0 +1,48 @@
+import random
+from typing import Tuple, Type
+
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramMigrateToChat,
+    TelegramNotFound,
+    TelegramRetryAfter,
+    TelegramUnauthorizedError
+)
+
+
+class RetryPolicy:
+    permanent_errors: Tuple[Type[Exception], ...] = (
+        TelegramBadRequest,
+        TelegramForbiddenError,
+        TelegramMigrateToChat,
+        TelegramNotFound,
+        TelegramUnauthorizedError
+    )
+
+    def __init__(
+            self,
+            *,
+            base_delay: float = 2,
+            max_delay: float = 600,
+            retry_after_jitter: float = 1
+    ) -> None:
+        self.base_delay: float = base_delay
+        self.max_delay: float = max_delay
+        self.retry_after_jitter: float = retry_after_jitter
+
+    def is_permanent(
+            self,
+            error: BaseException | None
+    ) -> bool:
+        return isinstance(error, self.permanent_errors)
+
+    def get_delay(
+            self,
+            retry_amount: int,
+            error: BaseException | None = None
+    ) -> float:
+        if isinstance(error, TelegramRetryAfter):
+            return error.retry_after + random.uniform(0, self.retry_after_jitter)
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry_amount))
@@ -0,0 +1,193 @@
+from datetime import datetime, timedelta
+from types import NoneType
+from typing import Dict, Any, Type
+
+from pytz import utc
+from redis.asyncio import Redis
+from sqlalchemy import Table, MetaData, Column, String, DateTime, Insert, select, update, or_
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database.database import Database
+
+# The claim is only taken while the run has not been recorded yet, both checks happen in one round trip
+CLAIM_SCRIPT: str = """
+local last_run = redis.call('GET', KEYS[1])
+if last_run and last_run >= ARGV[1] then
+    return 0
+end
+if redis.call('SET', KEYS[2], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return 1
+end
+return 0
+"""
+
+run_table: Table = Table(
+    "schedule_runs",
+    MetaData(),
+    Column("key", String, primary_key=True),
+    Column("last_run", DateTime(timezone=True)),
+    Column("claimed_until", DateTime(timezone=True))
+)
+
+
+class RunLedger:
+    def __init__(
+            self,
+            database: Database,
+            redis: Redis | None = None,
+            *,
+            grace: timedelta = timedelta(hours=2)
+    ) -> None:
+        self.database: Database = database
+        self.redis: Redis | None = redis
+        self.grace: timedelta = grace
+
+        self.ledger_strategy_dict: Dict[Type[Redis] | NoneType, dict[str, Any]] = {
+            Redis: {
+                "get": self.__get_from_redis,
+                "set": self.__set_to_redis,
+                "claim": self.__claim_in_redis,
+                "release": self.__release_in_redis
+            },
+            NoneType: {
+                "get": self.__get_from_database,
+                "set": self.__set_to_database,
+                "claim": self.__claim_in_database,
+                "release": self.__release_in_database
+            }
+        }
+
+    async def get_last_run(
+            self,
+            key: str
+    ) -> datetime | None:
+        return await self.ledger_strategy_dict[type(self.redis)]["get"](key)
+
+    async def set_last_run(
+            self,
+            key: str,
+            run_at: datetime
+    ) -> None:
+        await self.ledger_strategy_dict[type(self.redis)]["set"](key, run_at)
+
+    async def claim(
+            self,
+            key: str,
+            run_at: datetime,
+            lease_time: timedelta
+    ) -> bool:
+        return await self.ledger_strategy_dict[type(self.redis)]["claim"](key, run_at, lease_time)
+
+    async def release(
+            self,
+            key: str
+    ) -> None:
+        await self.ledger_strategy_dict[type(self.redis)]["release"](key)
+
+    async def __get_from_database(
+            self,
+            key: str
+    ) -> datetime | None:
+        async with self.database.session_maker() as db:
+            return await db.scalar(select(run_table.c.last_run).filter(run_table.c.key == key))
+
+    async def __set_to_database(
+            self,
+            key: str,
+            run_at: datetime
+    ) -> None:
+        query: Insert = insert(run_table).values(key=key, last_run=run_at)
+
+        async with self.database.session_maker() as db:
+            await db.execute(
+                query.on_conflict_do_update(
+                    index_elements=[run_table.c.key],
+                    set_={"last_run": run_at, "claimed_until": None}
+                )
+            )
+            await db.commit()
+
+    async def __claim_in_database(
+            self,
+            key: str,
+            run_at: datetime,
+            lease_time: timedelta
+    ) -> bool:
+        now: datetime = datetime.now(utc)
+        query: Insert = insert(run_table).values(key=key, claimed_until=now + lease_time)
+
+        # Like the Redis script, the claim is only taken while the run is unrecorded and nobody else holds it
+        async with self.database.session_maker() as db:
+            claimed_key: str | None = await db.scalar(
+                query.on_conflict_do_update(
+                    index_elements=[run_table.c.key],
+                    set_={"claimed_until": query.excluded.claimed_until},
+                    where=(
+                        or_(run_table.c.last_run.is_(None), run_table.c.last_run < run_at)
+                        & or_(run_table.c.claimed_until.is_(None), run_table.c.claimed_until < now)
+                    )
+                )
+                .returning(run_table.c.key)
+            )
+            await db.commit()
+
+        return claimed_key is not None
+
+    async def __release_in_database(
+            self,
+            key: str
+    ) -> None:
+        async with self.database.session_maker() as db:
+            await db.execute(
+                update(run_table)
+                .filter(run_table.c.key == key)
+                .values(claimed_until=None)
+            )
+            await db.commit()
+
+    async def __get_from_redis(
+            self,
+            key: str
+    ) -> datetime | None:
+        value: str | bytes | None = await self.redis.get(f"ledger:{key}")
+
+        if value is None:
+            return
+
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+
+        return datetime.fromisoformat(value)
+
+    async def __set_to_redis(
+            self,
+            key: str,
+            run_at: datetime
+    ) -> None:
+        async with self.redis.pipeline(transaction=True) as pipeline:
+            pipeline.set(f"ledger:{key}", run_at.isoformat())
+            pipeline.delete(f"ledger:claim:{key}")
+            await pipeline.execute()
+
+    async def __claim_in_redis(
+            self,
+            key: str,
+            run_at: datetime,
+            lease_time: timedelta
+    ) -> bool:
+        return bool(
+            await self.redis.eval(
+                CLAIM_SCRIPT,
+                2,
+                f"ledger:{key}",
+                f"ledger:claim:{key}",
+                run_at.isoformat(),
+                int(lease_time.total_seconds() * 1000)
+            )
+        )
+
+    async def __release_in_redis(
+            self,
+            key: str
+    ) -> None:
+        await self.redis.delete(f"ledger:claim:{key}")
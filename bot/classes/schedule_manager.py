@@ -1,10 +1,14 @@
 import asyncio
 import time
 import logging
-from typing import Tuple
+from typing import Tuple, Dict
 
 from aiogram import Bot
 
+from app.bot.classes.cluster import Cluster
+from app.bot.classes.deduplicator import Deduplicator
+from app.bot.classes.outbox import Outbox
+from app.bot.classes.scheduler_metrics import SchedulerMetrics
 from app.bot.classes.task_manager import TaskManager
 from app.bot.schedules.abstract_scheduler import AbstractScheduler
 
@@ -14,30 +18,120 @@ class ScheduleManager:
             self,
             *schedulers: AbstractScheduler,
             task_execution_delay: float = 10,
-            task_retry_amount: int = 10
+            task_collection_timeout: float = 60,
+            task_retry_amount: int = 10,
+            worker_amount: int = 16,
+            cluster: Cluster | None = None,
+            metrics: SchedulerMetrics | None = None,
+            deduplicator: Deduplicator | None = None,
+            outbox: Outbox | None = None
     ):
         self.schedulers: Tuple[AbstractScheduler, ...] = schedulers
+        self.locks: Dict[AbstractScheduler, asyncio.Lock] = {scheduler: asyncio.Lock() for scheduler in schedulers}
 
-        self.task_manager: TaskManager = TaskManager(task_retry_amount)
+        self.metrics: SchedulerMetrics = metrics if metrics is not None else SchedulerMetrics()
+        self.task_manager: TaskManager = TaskManager(
+            task_retry_amount,
+            worker_amount=worker_amount,
+            metrics=self.metrics,
+            deduplicator=deduplicator,
+            outbox=outbox
+        )
         self.task_execution_delay: float = task_execution_delay
+        self.task_collection_timeout: float = task_collection_timeout
+        self.cluster: Cluster = cluster if cluster is not None else Cluster()
         self.bot: Bot | None = None
 
     async def start_schedule(self):
-        logging.getLogger("scheduler").setLevel(logging.INFO)
-        logging.getLogger("scheduler").info("Start scheduling")
         logger = logging.getLogger("scheduler")
         logger.setLevel(logging.INFO)
         logger.info("Start scheduling")
-        started_func_time = time.monotonic()
-        logger.info("Started start_schedule %i", started_func_time)
+
+        self.task_manager.start()
+
+        await asyncio.gather(
+            self.cluster.run(),
+            *[self.run_scheduler(scheduler) for scheduler in self.schedulers]
+        )
+
+    async def run_scheduler(
+            self,
+            scheduler: AbstractScheduler
+    ) -> None:
+        logger = logging.getLogger("scheduler")
+        scheduler_name: str = type(scheduler).__name__
+
+        interval: float = self.task_execution_delay
+        if scheduler.collect_interval is not None:
+            interval = scheduler.collect_interval
+
+        try:
+            await scheduler.prepare()
+        except Exception as e:
+            logger.error(f"Preparation of {scheduler_name} raised an exception. Error: {e}")
 
         while True:
-            start_cycle = time.monotonic()
-            logger.info(f"Start schedule cycle of collection tasks: {start_cycle - started_func_time}")
-            for scheduler in self.schedulers:
-                 await self.task_manager.add_tasks(await scheduler.collect_tasks())
-                 logger.info(f"Ended collection tasks from {type(scheduler)} in {time.monotonic() - start_cycle}")
-
-            await asyncio.sleep(self.task_execution_delay)
-            await self.task_manager.inspect_tasks()
-       
+            if scheduler.is_singleton and not self.cluster.is_leader:
+                await asyncio.sleep(interval)
+                continue
+
+            await self.run_collection(scheduler)
+
+            delay: float | None = scheduler.get_collect_delay()
+
+            if delay is None:
+                delay = interval
+
+            await asyncio.sleep(delay)
+
+    async def run_collection(
+            self,
+            scheduler: AbstractScheduler
+    ) -> None:
+        logger = logging.getLogger("scheduler")
+        scheduler_name: str = type(scheduler).__name__
+
+        timeout: float = self.task_collection_timeout
+        if scheduler.collect_timeout is not None:
+            timeout = scheduler.collect_timeout
+
+        start_collection = time.monotonic()
+
+        try:
+            task_amount: int = await asyncio.wait_for(self.collect(scheduler), timeout)
+            collection_time: float = time.monotonic() - start_collection
+
+            self.metrics.collect_duration.labels(scheduler_name, "success").observe(collection_time)
+            self.metrics.collected_tasks.labels(scheduler_name).inc(task_amount)
+            logger.info(
+                f"Collected {task_amount} tasks from {scheduler_name} "
+                f"in {collection_time:.3f}s, "
+                f"task queue depth is {self.task_manager.queue_depth}"
+            )
+        except asyncio.TimeoutError:
+            self.metrics.collect_duration.labels(scheduler_name, "timeout").observe(timeout)
+            logger.error(f"Collection of tasks from {scheduler_name} timed out after {timeout}s")
+        except Exception as e:
+            self.metrics.collect_duration.labels(scheduler_name, "error").observe(
+                time.monotonic() - start_collection
+            )
+            logger.error(f"Collection of tasks from {scheduler_name} raised an exception. Error: {e}")
+
+    async def collect(
+            self,
+            scheduler: AbstractScheduler
+    ) -> int:
+        task_amount: int = 0
+
+        async with self.locks[scheduler]:
+            try:
+                async for tasks in scheduler.stream_tasks():
+                    await self.task_manager.add_tasks(tasks)
+                    task_amount += len(tasks)
+            except BaseException:
+                await scheduler.abort_collection()
+                raise
+
+            await scheduler.commit_collection()
+
+        return task_amount
@@ -1,6 +1,14 @@
 import asyncio
 from asyncio import Task
-from typing import Any, Tuple, Dict
+from datetime import datetime
+from hashlib import sha256
+from typing import Any, Tuple, Dict, List, Self
+from uuid import UUID
+
+from aiogram.types import BufferedInputFile
+
+from app.bot.enums.task_priority import TaskPriority
+from app.bot.notifiers.abstract_notifier import AbstractNotifier
 
 
 class ScheduleTask:
@@ -8,18 +16,107 @@ class ScheduleTask:
             self,
             coroutine: Any,
             *args: Any,
+            priority: TaskPriority = TaskPriority.NORMAL,
+            origin_time: datetime | None = None,
+            key: str | None = None,
             **kwargs: Any
     ) -> None:
         self.coroutine: Any = coroutine
         self.args: Tuple[Any, ...] = args
         self.kwargs: Dict[str, Any] = kwargs
+        self.priority: TaskPriority = priority
+        self.origin_time: datetime | None = origin_time
+        self.key: str | None = key
 
         self.task: Task | None = None
         self.retry_amount: int = -1
+        self.outbox_id: UUID | None = None
 
-    def run(self) -> None:
-        if self.task is not None and not self.task.done():
+    @property
+    def notifier(self) -> AbstractNotifier | None:
+        notifier: Any = getattr(self.coroutine, "__self__", None)
+
+        if isinstance(notifier, AbstractNotifier):
+            return notifier
+
+    @property
+    def notifier_name(self) -> str:
+        if self.notifier is None:
+            return "unknown"
+
+        return self.notifier.notify_method_name
+
+    @property
+    def dedup_key(self) -> str | None:
+        if self.key is None:
             return
 
+        return f"{self.notifier_name}:{self.kwargs.get('chat_id')}:{self.key}"
+
+    @property
+    def documents(self) -> List[BufferedInputFile]:
+        return [
+            value for value in [*self.args, *self.kwargs.values()]
+            if isinstance(value, BufferedInputFile)
+        ]
+
+    def run(self) -> Task:
+        if self.task is not None and not self.task.done():
+            return self.task
+
         self.task = asyncio.create_task(self.coroutine(*self.args, **self.kwargs))
         self.retry_amount += 1
+
+        return self.task
+
+    def to_payload(self) -> Dict[str, Any]:
+        if self.notifier is None:
+            raise ValueError(f"Task of {self.coroutine} is not bound to a notifier and cannot be serialized")
+
+        return {
+            "notifier": self.notifier.notify_method_name,
+            "method": self.coroutine.__name__,
+            "priority": self.priority.value,
+            "origin_time": self.origin_time.isoformat() if self.origin_time is not None else None,
+            "key": self.key,
+            "args": [self.__encode_value(arg) for arg in self.args],
+            "kwargs": {key: self.__encode_value(value) for key, value in self.kwargs.items()}
+        }
+
+    @classmethod
+    def from_payload(
+            cls,
+            payload: Dict[str, Any],
+            notifiers: Dict[str, AbstractNotifier],
+            documents: Dict[str, BufferedInputFile]
+    ) -> Self:
+        return cls(
+            getattr(notifiers[payload["notifier"]], payload["method"]),
+            *[cls.__decode_value(arg, documents) for arg in payload["args"]],
+            priority=TaskPriority(payload["priority"]),
+            origin_time=datetime.fromisoformat(payload["origin_time"]) if payload.get("origin_time") else None,
+            key=payload.get("key"),
+            **{key: cls.__decode_value(value, documents) for key, value in payload["kwargs"].items()}
+        )
+
+    @staticmethod
+    def get_document_id(document: BufferedInputFile) -> str:
+        return sha256(document.data + (document.filename or "").encode("utf-8")).hexdigest()
+
+    @classmethod
+    def __encode_value(cls, value: Any) -> Any:
+        # Documents are stored once by the outbox and only referenced from the payload
+        if isinstance(value, BufferedInputFile):
+            return {"__document__": cls.get_document_id(value)}
+
+        return value
+
+    @staticmethod
+    def __decode_value(
+            value: Any,
+            documents: Dict[str, BufferedInputFile]
+    ) -> Any:
+        if isinstance(value, dict) and "__document__" in value:
+            return documents[value["__document__"]]
+
+        return value
@@ -0,0 +1,59 @@
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, start_http_server
+
+
+class SchedulerMetrics:
+    def __init__(
+            self,
+            registry: CollectorRegistry | None = None
+    ) -> None:
+        self.registry: CollectorRegistry = registry if registry is not None else CollectorRegistry()
+
+        self.collect_duration: Histogram = Histogram(
+            "scheduler_collect_duration_seconds",
+            "Duration of collect_tasks per scheduler",
+            ["scheduler", "outcome"],
+            buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+            registry=self.registry
+        )
+        self.collected_tasks: Counter = Counter(
+            "scheduler_collected_tasks_total",
+            "Tasks collected per scheduler",
+            ["scheduler"],
+            registry=self.registry
+        )
+        self.queue_depth: Gauge = Gauge(
+            "scheduler_task_queue_depth",
+            "Tasks waiting in the TaskManager queue",
+            registry=self.registry
+        )
+        self.pending_tasks: Gauge = Gauge(
+            "scheduler_pending_tasks",
+            "Tasks held by the TaskManager, including the ones waiting for a retry",
+            registry=self.registry
+        )
+        self.sends: Counter = Counter(
+            "scheduler_sends_total",
+            "Task executions per notifier by outcome",
+            ["notifier", "outcome"],
+            registry=self.registry
+        )
+        self.retries: Counter = Counter(
+            "scheduler_task_retries_total",
+            "Scheduled task retries per notifier",
+            ["notifier"],
+            registry=self.registry
+        )
+        self.delivery_latency: Histogram = Histogram(
+            "scheduler_delivery_latency_seconds",
+            "Time from the origin of a notification, such as an entry, to its delivery",
+            ["notifier"],
+            buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300),
+            registry=self.registry
+        )
+
+    def start_server(
+            self,
+            port: int = 9100,
+            address: str = "0.0.0.0"
+    ) -> None:
+        start_http_server(port, addr=address, registry=self.registry)
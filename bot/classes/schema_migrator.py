@@ -0,0 +1,102 @@
+import logging
+from datetime import datetime
+from typing import Tuple
+
+from pytz import utc
+from sqlalchemy import Table, MetaData, Column, String, DateTime, select, insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.bot.classes.migration import Migration
+from app.database.database import Database
+
+migration_table: Table = Table(
+    "bot_schema_migrations",
+    MetaData(),
+    Column("name", String, primary_key=True),
+    Column("applied_at", DateTime(timezone=True), nullable=False)
+)
+
+
+class SchemaMigrator:
+    def __init__(
+            self,
+            database: Database,
+            *migrations: Migration,
+            lock_id: int = 7_364_119
+    ) -> None:
+        self.database: Database = database
+        self.migrations: Tuple[Migration, ...] = migrations
+        self.lock_id: int = lock_id
+
+    async def migrate(self) -> None:
+        async with self.database.session_maker() as db:
+            connection: AsyncConnection = await db.connection()
+            await connection.run_sync(lambda sync_connection: migration_table.create(sync_connection, checkfirst=True))
+            await db.commit()
+
+        for migration in self.migrations:
+            if migration.is_transactional:
+                await self.__apply_in_transaction(migration)
+            else:
+                await self.__apply_in_autocommit(migration)
+
+    async def __apply_in_transaction(
+            self,
+            migration: Migration
+    ) -> None:
+        async with self.database.session_maker() as db:
+            connection: AsyncConnection = await db.connection()
+
+            # The bot and the scheduler both migrate on startup, the lock lets only one of them apply each step
+            await connection.exec_driver_sql(f"SELECT pg_advisory_xact_lock({self.lock_id})")
+
+            if await self.__is_applied(connection, migration):
+                return
+
+            await migration.apply(connection)
+            await self.__record(connection, migration)
+            await db.commit()
+
+    async def __apply_in_autocommit(
+            self,
+            migration: Migration
+    ) -> None:
+        async with self.database.session_maker() as db:
+            # Steps such as concurrent index builds cannot run inside a transaction, so they hold a session lock
+            connection: AsyncConnection = await db.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+            await connection.exec_driver_sql(f"SELECT pg_advisory_lock({self.lock_id})")
+
+            try:
+                if await self.__is_applied(connection, migration):
+                    return
+
+                await migration.apply(connection)
+                await self.__record(connection, migration)
+            finally:
+                await connection.exec_driver_sql(f"SELECT pg_advisory_unlock({self.lock_id})")
+
+    @staticmethod
+    async def __is_applied(
+            connection: AsyncConnection,
+            migration: Migration
+    ) -> bool:
+        # Repeatable steps bring the database in line with the current config, so they run on every startup
+        if migration.is_repeatable:
+            return False
+
+        applied_name: str | None = await connection.scalar(
+            select(migration_table.c.name).filter(migration_table.c.name == migration.name)
+        )
+
+        return applied_name is not None
+
+    @staticmethod
+    async def __record(
+            connection: AsyncConnection,
+            migration: Migration
+    ) -> None:
+        if migration.is_repeatable:
+            return
+
+        await connection.execute(insert(migration_table).values(name=migration.name, applied_at=datetime.now(utc)))
+        logging.info(f"Applied the {migration.name} migration")
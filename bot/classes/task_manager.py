@@ -1,45 +1,265 @@
+import asyncio
 import logging
-from typing import Dict, Any, List
-from uuid import uuid4
+from asyncio import Task
+from datetime import datetime
+from itertools import count
+from typing import Dict, Any, List, Tuple, Iterator, Set
+from uuid import uuid4, UUID
 
-from click import UUID
+from pytz import utc
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
 
+from app.bot.classes.deduplicator import Deduplicator
+from app.bot.classes.outbox import Outbox
+from app.bot.classes.retry_policy import RetryPolicy
 from app.bot.classes.schedule_task import ScheduleTask
+from app.bot.classes.scheduler_metrics import SchedulerMetrics
 
 
 class TaskManager:
     def __init__(
             self,
-            task_retry_amount: int
+            task_retry_amount: int,
+            *,
+            worker_amount: int = 16,
+            retry_policy: RetryPolicy | None = None,
+            metrics: SchedulerMetrics | None = None,
+            deduplicator: Deduplicator | None = None,
+            outbox: Outbox | None = None
     ) -> None:
         self.tasks: Dict[UUID, ScheduleTask] = {}
         self.task_retry_amount: int = task_retry_amount
+        self.worker_amount: int = worker_amount
+        self.retry_policy: RetryPolicy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.metrics: SchedulerMetrics = metrics if metrics is not None else SchedulerMetrics()
+        self.deduplicator: Deduplicator = deduplicator if deduplicator is not None else Deduplicator()
+        self.outbox: Outbox | None = outbox
+
+        self.queue: asyncio.PriorityQueue[Tuple[int, int, UUID]] = asyncio.PriorityQueue()
+        self.workers: List[Task] = []
+        self.consumer: Task | None = None
+        self.counter: Iterator[int] = count()
+        self.outbox_ids: Set[UUID] = set()
+        self.outbox_event: asyncio.Event = asyncio.Event()
+
+        self.metrics.queue_depth.set_function(lambda: self.queue_depth)
+        self.metrics.pending_tasks.set_function(lambda: len(self.tasks))
+
+    @property
+    def queue_depth(self) -> int:
+        return self.queue.qsize()
+
+    def start(self) -> None:
+        while len(self.workers) < self.worker_amount:
+            self.workers.append(asyncio.create_task(self.__work()))
+
+        if self.consumer is not None:
+            return
+
+        if self.outbox is not None:
+            self.consumer = asyncio.create_task(self.__drain())
 
     async def add_tasks(
             self,
             tasks: List[ScheduleTask]
     ) -> None:
+        if self.outbox is not None:
+            # Tasks written by their collector inside its own transaction already have an outbox row
+            await self.outbox.add_tasks([task for task in tasks if task.outbox_id is None])
+            self.outbox_event.set()
+            return
+
         for task in tasks:
-            self.tasks[uuid4()] = task
-            task.run()
+            self.add_task(task)
+
+    def add_task(
+            self,
+            task: ScheduleTask
+    ) -> None:
+        uuid: UUID = uuid4()
+        self.tasks[uuid] = task
+        self.enqueue(uuid)
+
+        if task.outbox_id is not None:
+            self.outbox_ids.add(task.outbox_id)
 
-    def remove_task(
+    def enqueue(
             self,
             uuid: UUID
     ) -> None:
         if uuid in self.tasks:
-            self.tasks.pop(uuid)
+            self.queue.put_nowait((self.tasks[uuid].priority, next(self.counter), uuid))
+
+    async def finish_task(
+            self,
+            uuid: UUID
+    ) -> None:
+        if uuid not in self.tasks:
+            return
+
+        schedule_task: ScheduleTask = self.tasks.pop(uuid)
+
+        if schedule_task.outbox_id is not None and self.outbox is not None:
+            self.outbox_ids.discard(schedule_task.outbox_id)
+
+            try:
+                await self.outbox.acknowledge(schedule_task.outbox_id)
+            except (SQLAlchemyError, OSError) as e:
+                logging.error(f"Task {uuid} could not be marked as delivered. Error: {e}")
+
+    async def inspect_task(
+            self,
+            uuid: UUID
+    ) -> None:
+        schedule_task: ScheduleTask = self.tasks[uuid]
+
+        notifier_name: str = schedule_task.notifier_name
+
+        if schedule_task.task.cancelled():
+            self.metrics.sends.labels(notifier_name, "cancelled").inc()
+            await self.finish_task(uuid)
+            return
+
+        error: BaseException | None = schedule_task.task.exception()
+
+        if error is None:
+            result: Any = schedule_task.task.result()
+
+            if result:
+                self.metrics.sends.labels(notifier_name, "delivered").inc()
+                self.observe_latency(schedule_task)
+                await self.finish_task(uuid)
+                return
+
+        if self.retry_policy.is_permanent(error):
+            logging.error(f"Task {uuid} failed permanently. Error: {error}")
+            self.metrics.sends.labels(notifier_name, "permanent_failure").inc()
+            await self.release_task(uuid)
+            await self.finish_task(uuid)
+            return
+
+        if schedule_task.retry_amount >= self.task_retry_amount:
+            logging.error(f"Task {uuid} exhausted {schedule_task.retry_amount} retries. Error: {error}")
+            self.metrics.sends.labels(notifier_name, "exhausted").inc()
+            await self.release_task(uuid)
+            await self.finish_task(uuid)
+            return
+
+        self.metrics.sends.labels(notifier_name, "transient_failure").inc()
+        self.metrics.retries.labels(notifier_name).inc()
+
+        delay: float = self.retry_policy.get_delay(schedule_task.retry_amount, error)
+        logging.warning(f"Task {uuid} will be retried in {delay:.1f}s. Error: {error}")
+
+        if schedule_task.outbox_id is not None and self.outbox is not None:
+            try:
+                await self.outbox.postpone(schedule_task.outbox_id, delay)
+            except (SQLAlchemyError, OSError) as e:
+                logging.error(f"Task {uuid} could not extend its outbox lease. Error: {e}")
+
+        asyncio.get_running_loop().call_later(delay, self.enqueue, uuid)
 
-    async def inspect_tasks(self) -> None:
-        for uuid, schedule_task in self.tasks.copy().items():
-            if not schedule_task.task.done():
+    async def claim_task(
+            self,
+            uuid: UUID
+    ) -> bool:
+        schedule_task: ScheduleTask = self.tasks[uuid]
+        dedup_key: str | None = schedule_task.dedup_key
+
+        if dedup_key is None:
+            return True
+
+        try:
+            is_claimed: bool = await self.deduplicator.claim(dedup_key, self.get_task_owner(uuid))
+        except RedisError as e:
+            logging.error(f"Task {uuid} could not be checked for duplicates. Error: {e}")
+            return True
+
+        if not is_claimed:
+            logging.info(f"Task {uuid} was skipped as {dedup_key} has already been delivered")
+            self.metrics.sends.labels(schedule_task.notifier_name, "duplicate").inc()
+            await self.finish_task(uuid)
+
+        return is_claimed
+
+    async def release_task(
+            self,
+            uuid: UUID
+    ) -> None:
+        dedup_key: str | None = self.tasks[uuid].dedup_key
+
+        if dedup_key is None:
+            return
+
+        try:
+            await self.deduplicator.release(dedup_key, self.get_task_owner(uuid))
+        except RedisError as e:
+            logging.error(f"Task {uuid} could not release {dedup_key}. Error: {e}")
+
+    def get_task_owner(
+            self,
+            uuid: UUID
+    ) -> str:
+        schedule_task: ScheduleTask = self.tasks[uuid]
+
+        if schedule_task.outbox_id is not None:
+            return str(schedule_task.outbox_id)
+
+        return str(uuid)
+
+    def observe_latency(
+            self,
+            schedule_task: ScheduleTask
+    ) -> None:
+        if schedule_task.origin_time is None:
+            return
+
+        origin_time: datetime = schedule_task.origin_time
+
+        if origin_time.tzinfo is None:
+            origin_time = origin_time.replace(tzinfo=utc)
+
+        self.metrics.delivery_latency.labels(schedule_task.notifier_name).observe(
+            (datetime.now(utc) - origin_time).total_seconds()
+        )
+
+    async def __work(self) -> None:
+        while True:
+            _, _, uuid = await self.queue.get()
+
+            schedule_task: ScheduleTask | None = self.tasks.get(uuid)
+
+            if schedule_task is not None and await self.claim_task(uuid):
+                await asyncio.wait([schedule_task.run()])
+                await self.inspect_task(uuid)
+
+            self.queue.task_done()
+
+    async def __drain(self) -> None:
+        while True:
+            capacity: int = self.worker_amount * 2 - self.queue_depth
+
+            if capacity <= 0:
+                await asyncio.sleep(0.1)
                 continue
+
             try:
-                result: Any = schedule_task.task.result()
-                if result or schedule_task.retry_amount > self.task_retry_amount:
-                    self.remove_task(uuid)
-                else:
-                    self.tasks[uuid].run()
-            except Exception as e:
-                logging.error(f"Task {uuid} raised an exception. Error: {e}")
-                self.tasks[uuid].run()
+                tasks: List[ScheduleTask] = await self.outbox.claim(capacity)
+                await self.outbox.purge()
+            except (SQLAlchemyError, OSError) as e:
+                logging.error(f"Tasks could not be claimed from the outbox. Error: {e}")
+                await asyncio.sleep(self.outbox.poll_delay)
+                continue
+
+            for task in tasks:
+                if task.outbox_id not in self.outbox_ids:
+                    self.add_task(task)
+
+            if len(tasks) == 0:
+                try:
+                    await asyncio.wait_for(self.outbox_event.wait(), self.outbox.poll_delay)
+                except asyncio.TimeoutError:
+                    pass
+
+                self.outbox_event.clear()
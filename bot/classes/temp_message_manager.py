@@ -62,7 +62,6 @@ class TempMessageManager:
         for message_id in self.temp_messages.get(chat_id):
             try:
                 await self.bot.delete_message(chat_id, message_id)
-                await asyncio.sleep(0.1)
             except AiogramError:
                 continue
 
@@ -106,7 +105,6 @@ class TempMessageManager:
             for message_id in messages:
                 try:
                     await self.bot.delete_message(chat_id, int(message_id))
-                    await asyncio.sleep(0.1)
                 except AiogramError:
                     continue
         except UnicodeDecodeError:
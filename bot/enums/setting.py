@@ -8,3 +8,4 @@ class Setting(Enum):
 class BoolSetting(Setting):
     ALLOW_MESSAGES = "send_bot_messages"
     ALLOW_VARIATIONS = "allow_bot_variations"
+    NIGHT_DIGEST = "night_digest"
@@ -0,0 +1,53 @@
+import logging
+from typing import Tuple
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod, Response
+from aiogram.methods.base import TelegramType
+
+from app.bot.classes.rate_limiter import RateLimiter
+
+# Only methods that post a new message count towards the per chat limit, edits and deletes only share the global one
+SEND_METHOD_PREFIXES: Tuple[str, ...] = ("send", "copy", "forward")
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    def __init__(
+            self,
+            rate_limiter: RateLimiter,
+            *,
+            retry_amount: int = 3
+    ) -> None:
+        self.rate_limiter = rate_limiter
+        self.retry_amount = retry_amount
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: TelegramMethod[TelegramType]
+    ) -> Response[TelegramType]:
+        chat_id: int | str | None = getattr(method, "chat_id", None)
+
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        if not method.__api_method__.startswith(SEND_METHOD_PREFIXES):
+            chat_id = None
+
+        retry_amount: int = 0
+
+        while True:
+            await self.rate_limiter.acquire(chat_id)
+
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if retry_amount >= self.retry_amount:
+                    raise
+
+                retry_amount += 1
+                logging.warning(f"Flood control exceeded on {type(method).__name__}, retrying in {e.retry_after}s")
+                await self.rate_limiter.pause(e.retry_after)
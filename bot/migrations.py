@@ -0,0 +1,113 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import Index, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.bot.classes.attendance_rollup import AttendanceRollup, rollup_table
+from app.bot.classes.entry_listener import ENTRY_CREATED_CHANNEL
+from app.bot.classes.migration import Migration
+from app.bot.classes.night_digest_buffer import digest_table
+from app.bot.classes.outbox import outbox_metadata
+from app.bot.classes.run_ledger import run_table
+from app.database.models import Settings, Entry
+from app.services.config import Config
+
+
+async def add_settings_night_digest(connection: AsyncConnection) -> None:
+    await connection.exec_driver_sql(
+        f"ALTER TABLE {Settings.__tablename__} "
+        f"ADD COLUMN IF NOT EXISTS night_digest BOOLEAN NOT NULL DEFAULT FALSE"
+    )
+
+
+async def create_night_digest_entries(connection: AsyncConnection) -> None:
+    await connection.run_sync(lambda sync_connection: digest_table.create(sync_connection, checkfirst=True))
+
+
+async def create_notification_outbox(connection: AsyncConnection) -> None:
+    await connection.run_sync(lambda sync_connection: outbox_metadata.create_all(sync_connection))
+
+
+async def create_schedule_runs(connection: AsyncConnection) -> None:
+    await connection.run_sync(lambda sync_connection: run_table.create(sync_connection, checkfirst=True))
+
+
+async def add_attendance_rollup_updated_at(connection: AsyncConnection) -> None:
+    await connection.exec_driver_sql(
+        f"ALTER TABLE {rollup_table.name} "
+        f"ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()"
+    )
+    await connection.exec_driver_sql(
+        f"CREATE INDEX IF NOT EXISTS ix_{rollup_table.name}_day_updated_at ON {rollup_table.name} (day, updated_at)"
+    )
+
+    # Rollups installed before the column existed get the triggers that keep it current
+    await AttendanceRollup.install(connection)
+
+
+async def create_entry_created_trigger(connection: AsyncConnection) -> None:
+    table: str = Entry.__tablename__
+
+    await connection.exec_driver_sql(
+        f"""
+        CREATE OR REPLACE FUNCTION notify_{table}_created() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{ENTRY_CREATED_CHANNEL}', NEW.id::text);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    await connection.exec_driver_sql(
+        f"""
+        CREATE OR REPLACE TRIGGER {table}_created_notify
+        AFTER INSERT ON {table}
+        FOR EACH ROW EXECUTE FUNCTION notify_{table}_created()
+        """
+    )
+
+
+async def create_entry_unnotified_index(connection: AsyncConnection) -> None:
+    index: Index = Index(
+        f"ix_{Entry.__tablename__}_unnotified_created_at",
+        Entry.created_at,
+        postgresql_where=Entry.notified_at.is_(None),
+        postgresql_concurrently=True
+    )
+
+    is_valid: bool | None = await connection.scalar(
+        text(
+            "SELECT pg_index.indisvalid FROM pg_index "
+            "JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+            "WHERE pg_class.relname = :name"
+        ),
+        {"name": index.name}
+    )
+
+    # A failed concurrent build leaves an invalid index behind that has to be dropped before it is rebuilt
+    if is_valid is False:
+        await connection.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}")
+
+    if is_valid is not True:
+        await connection.run_sync(lambda sync_connection: index.create(sync_connection))
+
+
+def create_migrations(config: Config) -> List[Migration]:
+    # The rollup triggers read the school start time and timezone from a settings row that follows the config
+    attendance_rollup: AttendanceRollup = AttendanceRollup(
+        start_time=datetime.strptime(config.school_day_start_time, "%H:%M").time(),
+        timezone_name=config.timezone
+    )
+
+    return [
+        Migration("entry_created_trigger", create_entry_created_trigger),
+        Migration("settings_night_digest", add_settings_night_digest),
+        Migration("night_digest_entries", create_night_digest_entries),
+        Migration("attendance_rollup", attendance_rollup.install),
+        Migration("attendance_rollup_updated_at", add_attendance_rollup_updated_at),
+        Migration("attendance_rollup_settings", attendance_rollup.configure, is_repeatable=True),
+        Migration("schedule_runs", create_schedule_runs),
+        Migration("notification_outbox", create_notification_outbox),
+        Migration("entry_unnotified_index", create_entry_unnotified_index, is_transactional=False)
+    ]
@@ -1,16 +1,30 @@
+import asyncio
+from hashlib import sha256
+from typing import Dict, Tuple
+
 from aiogram import Bot
-from aiogram.types import BufferedInputFile
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, Message
 
 from app.bot.notifiers.abstract_notifier import AbstractNotifier
 
+FILE_ID_ERRORS: Tuple[str, ...] = ("file identifier", "file_id", "file reference")
+
 
 class TelegramNotifier(AbstractNotifier):
     def __init__(
             self,
-            bot: Bot
+            bot: Bot,
+            *,
+            max_cached_files: int = 128
     ) -> None:
         self.bot: Bot = bot
 
+        self.max_cached_files: int = max_cached_files
+        self.file_ids: Dict[str, str] = {}
+        self.upload_locks: Dict[str, asyncio.Lock] = {}
+        self.upload_waiters: Dict[str, int] = {}
+
     async def notify(
             self,
             chat_id: int,
@@ -19,10 +33,10 @@ class TelegramNotifier(AbstractNotifier):
             **kwargs
     ) -> bool:
         if document is not None:
-            await self.bot.send_document(
+            await self.send_document(
                 chat_id,
-                document,
-                caption=text
+                text,
+                document
             )
         else:
             await self.bot.send_message(
@@ -32,5 +46,71 @@ class TelegramNotifier(AbstractNotifier):
 
         return True
 
+    async def send_document(
+            self,
+            chat_id: int,
+            text: str,
+            document: BufferedInputFile
+    ) -> None:
+        document_key: str = f"{sha256(document.data).hexdigest()}:{document.filename}"
+        file_id: str | None = self.file_ids.get(document_key)
+
+        if file_id is None:
+            # The first recipient uploads the file while the others wait for its file_id
+            lock: asyncio.Lock = self.upload_locks.setdefault(document_key, asyncio.Lock())
+            self.upload_waiters[document_key] = self.upload_waiters.get(document_key, 0) + 1
+
+            try:
+                async with lock:
+                    file_id = self.file_ids.get(document_key)
+
+                    if file_id is None:
+                        await self.upload_document(chat_id, text, document, document_key)
+                        return
+            finally:
+                # The lock is dropped by the last task using it, so a failed upload is never retried in parallel
+                self.upload_waiters[document_key] -= 1
+
+                if self.upload_waiters[document_key] == 0:
+                    self.upload_waiters.pop(document_key)
+
+                    if self.upload_locks.get(document_key) is lock:
+                        self.upload_locks.pop(document_key)
+
+        try:
+            await self.bot.send_document(
+                chat_id,
+                file_id,
+                caption=text
+            )
+        except TelegramBadRequest as e:
+            # Only a rejected file_id is re-uploaded, other errors belong to the recipient or the caption
+            if not any(error in e.message.lower() for error in FILE_ID_ERRORS):
+                raise
+
+            self.file_ids.pop(document_key, None)
+            await self.upload_document(chat_id, text, document, document_key)
+
+    async def upload_document(
+            self,
+            chat_id: int,
+            text: str,
+            document: BufferedInputFile,
+            document_key: str
+    ) -> None:
+        message: Message = await self.bot.send_document(
+            chat_id,
+            document,
+            caption=text
+        )
+
+        if message.document is None:
+            return
+
+        while len(self.file_ids) >= self.max_cached_files:
+            self.file_ids.pop(next(iter(self.file_ids)))
+
+        self.file_ids[document_key] = message.document.file_id
+
     @property
     def notify_method_name(self) -> str: return "telegram"
@@ -110,8 +110,6 @@ class AnnouncementScene(SendScene, state="announcement"):
                 successful_sends += 1
             except AiogramError as e:
                 logging.error(e)
-                continue
-            await asyncio.sleep(0.1)
 
         await callback_query.message.answer(
             _("announcement.sent").format(successful_sends=successful_sends, parents=len(parents)),
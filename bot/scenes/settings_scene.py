@@ -102,6 +102,13 @@ class SettingsScene(BaseScene, state="settings"):
                         value=not settings.allow_bot_variations
                     ).pack()
                 )
+                builder.button(
+                    text=button_dict.get(BoolSetting.NIGHT_DIGEST).get(settings.night_digest),
+                    callback_data=ChangeBoolSettingAction(
+                        setting=BoolSetting.NIGHT_DIGEST,
+                        value=not settings.night_digest
+                    ).pack()
+                )
 
             builder.button(
                 text=_("button.disable_bot"),
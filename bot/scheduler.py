@@ -7,13 +7,29 @@ from aiogram import Bot
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.utils.i18n import I18n
+from pytz import timezone
+from redis.asyncio import Redis
 
+from app.bot.classes.attendance_snapshot import AttendanceSnapshot
+from app.bot.classes.cluster import Cluster
+from app.bot.classes.deduplicator import Deduplicator
+from app.bot.classes.entry_listener import EntryListener
+from app.bot.classes.night_digest_buffer import NightDigestBuffer
+from app.bot.classes.outbox import Outbox
+from app.bot.classes.rate_limiter import RateLimiter
+from app.bot.classes.report_renderer import ReportRenderer
+from app.bot.classes.run_ledger import RunLedger
 from app.bot.classes.schedule_manager import ScheduleManager
+from app.bot.classes.scheduler_metrics import SchedulerMetrics
+from app.bot.classes.schema_migrator import SchemaMigrator
+from app.bot.middlewares.rate_limit import RateLimitMiddleware
+from app.bot.migrations import create_migrations
 from app.bot.notifiers.abstract_notifier import AbstractNotifier
 from app.bot.notifiers.telegram_notifier import TelegramNotifier
 from app.bot.schedules.daily.daily_late_logs_scheduler import DailyLateLogsScheduler
 from app.bot.schedules.daily.daily_present_logs_scheduler import DailyPresentLogsScheduler
 from app.bot.schedules.daily.daily_stats_scheduler import DailyStatsScheduler
+from app.bot.schedules.daily.night_digest_scheduler import NightDigestScheduler
 from app.bot.schedules.regular.enters_scheduler import EntersScheduler
 from app.bot.schedules.regular.metrics_scheduler import MetricsScheduler
 from app.bot.schedules.weekly.weekly_antirating_scheduler import WeeklyAntiRatingScheduler
@@ -35,6 +51,13 @@ async def main() -> None:
     logger: logging.Logger = logging.getLogger("schedule_logger")
     logger.setLevel(logging.INFO)
 
+    redis: Redis | None = None
+
+    if config.redis_storage_dsn is not None:
+        redis = Redis.from_url(str(config.redis_storage_dsn))
+
+    bot.session.middleware(RateLimitMiddleware(RateLimiter(redis)))
+
     database: Database = create_db(str(config.postgresql_dsn))
     i18n: I18n = I18n(
         path=config.locale_path,
@@ -45,13 +68,31 @@ async def main() -> None:
         TelegramNotifier(bot)
     ]
 
+    await SchemaMigrator(database, *create_migrations(config)).migrate()
+
+    scheduler_metrics: SchedulerMetrics = SchedulerMetrics()
+    scheduler_metrics.start_server(config.scheduler_metrics_port)
+
+    cluster: Cluster = Cluster(redis)
+    run_ledger: RunLedger = RunLedger(database, redis)
+    outbox: Outbox = Outbox(database, notifiers)
+    digest_buffer: NightDigestBuffer = NightDigestBuffer(database)
+    report_renderer: ReportRenderer = ReportRenderer(pool_size=config.report_renderer_pool_size)
+    attendance_snapshot: AttendanceSnapshot = AttendanceSnapshot(database, timezone(config.timezone))
+
+    enters_scheduler: EntersScheduler = EntersScheduler(
+        config,
+        database,
+        i18n,
+        notifiers,
+        cluster=cluster,
+        outbox=outbox,
+        digest_buffer=digest_buffer
+    )
+    entry_listener: EntryListener = EntryListener(str(config.postgresql_dsn))
+
     scheduler: ScheduleManager = ScheduleManager(
-        EntersScheduler(
-            config,
-            database,
-            i18n,
-            notifiers
-        ),
+        enters_scheduler,
         MetricsScheduler(
             config,
             database,
@@ -62,35 +103,63 @@ async def main() -> None:
             config,
             database,
             i18n,
-            notifiers
+            notifiers,
+            ledger=run_ledger,
+            attendance_snapshot=attendance_snapshot
         ),
         DailyLateLogsScheduler(
             config,
             database,
             i18n,
-            notifiers
+            notifiers,
+            ledger=run_ledger,
+            attendance_snapshot=attendance_snapshot
         ),
         DailyStatsScheduler(
             config,
             database,
             i18n,
-            notifiers
+            notifiers,
+            ledger=run_ledger,
+            report_renderer=report_renderer
+        ),
+        NightDigestScheduler(
+            config,
+            database,
+            i18n,
+            notifiers,
+            digest_buffer=digest_buffer,
+            ledger=run_ledger
         ),
         WeeklyAntiRatingScheduler(
             config,
             database,
             i18n,
-            notifiers
+            notifiers,
+            ledger=run_ledger,
+            report_renderer=report_renderer
         ),
         WeeklyGroupAntiRatingScheduler(
             config,
             database,
             i18n,
-            notifiers
-        )
+            notifiers,
+            ledger=run_ledger,
+            report_renderer=report_renderer
+        ),
+        cluster=cluster,
+        metrics=scheduler_metrics,
+        deduplicator=Deduplicator(redis),
+        outbox=outbox
     )
 
-    await scheduler.start_schedule()
+    try:
+        await asyncio.gather(
+            scheduler.start_schedule(),
+            entry_listener.listen(lambda: scheduler.run_collection(enters_scheduler))
+        )
+    finally:
+        report_renderer.shutdown()
 
 
 if __name__ == "__main__":
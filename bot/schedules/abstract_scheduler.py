@@ -1,10 +1,29 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, AsyncIterator
 
 from app.bot.classes.schedule_task import ScheduleTask
 
 
 class AbstractScheduler(ABC):
+    collect_interval: float | None = None
+    collect_timeout: float | None = None
+    is_singleton: bool = False
+
+    async def prepare(self) -> None:
+        pass
+
     @abstractmethod
     async def collect_tasks(self) -> List[ScheduleTask]:
         pass
+
+    async def stream_tasks(self) -> AsyncIterator[List[ScheduleTask]]:
+        yield await self.collect_tasks()
+
+    async def commit_collection(self) -> None:
+        pass
+
+    async def abort_collection(self) -> None:
+        pass
+
+    def get_collect_delay(self) -> float | None:
+        return None
@@ -1,11 +1,14 @@
 import logging
-from datetime import time, datetime
+from datetime import time, datetime, date
 from typing import List
 
+from aiogram import html
 from aiogram.utils.i18n import I18n
-from pytz import timezone
-from pyuca import Collator
+from pytz import timezone, utc
 
+from app.bot.classes.attendance_snapshot import AttendanceSnapshot
+from app.bot.classes.group_attendance import GroupAttendance
+from app.bot.classes.run_ledger import RunLedger
 from app.bot.classes.schedule_task import ScheduleTask
 from app.bot.notifiers.abstract_notifier import AbstractNotifier
 from app.bot.schedules.abstract_scheduler import AbstractScheduler
@@ -14,11 +17,8 @@ from app.bot.schedules.timestamps.daily_timestamp import DailyTimestamp
 from app.bot.variations.variation_type import VariationType
 from app.bot.variations.variations import variations
 from app.database.database import Database
+from app.database.models import Account
 from app.services.config import Config
-from app.statistics.models.present_report_model import PresentReportModel
-from app.statistics.reports_creator import ReportsCreator
-
-collator: Collator = Collator()
 
 
 class DailyPresentLogsScheduler(DailyScheduler, AbstractScheduler):
@@ -29,50 +29,57 @@ class DailyPresentLogsScheduler(DailyScheduler, AbstractScheduler):
             i18n: I18n,
             notifiers: List[AbstractNotifier],
             *,
-            log_on_weekends: bool = False
+            log_on_weekends: bool = False,
+            ledger: RunLedger | None = None,
+            attendance_snapshot: AttendanceSnapshot | None = None
     ) -> None:
         self.database: Database = database
         self.i18n: I18n = i18n
         self.notifiers: List[AbstractNotifier] = notifiers
 
-        self.reports_creator: ReportsCreator = ReportsCreator(database, i18n, timezone(config.timezone))
+        self.attendance_snapshot: AttendanceSnapshot = (
+            attendance_snapshot if attendance_snapshot is not None
+            else AttendanceSnapshot(database, timezone(config.timezone))
+        )
 
-        self.start_time: time = datetime.strptime(config.school_day_start_time, "%H:%M").time()
         self.log_time: time = datetime.strptime(config.schedule_present_log_time, "%H:%M").time()
 
-        super().__init__(DailyTimestamp(time=self.log_time), log_on_weekends=log_on_weekends)
+        super().__init__(DailyTimestamp(time=self.log_time), log_on_weekends=log_on_weekends, ledger=ledger)
 
     async def collect_tasks(self) -> List[ScheduleTask]:
         schedule_tasks: List[ScheduleTask] = []
 
-        if not self.do_send_logs():
+        if not await self.do_send_logs():
             return schedule_tasks
 
-        report_entries: List[PresentReportModel] = await self.reports_creator.create_present_reports(self.start_time)
+        report_date: date = datetime.now(utc).date()
+        group_attendances: List[GroupAttendance] = await self.attendance_snapshot.get_group_attendances()
+
+        for group_attendance in group_attendances:
+            supervisor: Account = group_attendance.group.supervisor
 
-        for report_entry in report_entries:
             message: str = variations.get_log_variation(
-                report_entry.supervisor.settings.allow_bot_variations
-                if report_entry.supervisor.settings is not None else False,
+                supervisor.settings.allow_bot_variations if supervisor.settings is not None else False,
                 VariationType.PRESENT
             ).format(
-                present=report_entry.presence_message,
-                absent=report_entry.absence_message,
-                info=report_entry.group.name
+                present="\n".join(html.quote(full_name) for full_name in group_attendance.present) or "—",
+                absent="\n".join(html.quote(full_name) for full_name in group_attendance.absent) or "—",
+                info=group_attendance.group.name
             )
 
             for notifier in self.notifiers:
                 schedule_tasks.append(
                     ScheduleTask(
                         notifier.notify,
-                        chat_id=report_entry.supervisor.telegram_id,
-                        text=message
+                        chat_id=supervisor.telegram_id,
+                        text=message,
+                        key=f"present_log:{group_attendance.group.id}:{report_date}"
                     )
                 )
 
                 logging.getLogger("scheduler").info(
-                    f"A task has been appended to send {report_entry.supervisor.full_name} "
-                    f"daily logs of all present students from {report_entry.group.name} "
+                    f"A task has been appended to send {supervisor.full_name} "
+                    f"daily logs of all present students from {group_attendance.group.name} "
                     f"by {notifier.notify_method_name}"
                 )
 
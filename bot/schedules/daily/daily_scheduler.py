@@ -1,36 +1,41 @@
-from datetime import datetime, time
-from typing import Tuple
-
-from pytz import utc
+from datetime import datetime, timedelta
 
+from app.bot.classes.run_ledger import RunLedger
+from app.bot.schedules.timestamp_scheduler import TimestampScheduler
 from app.bot.schedules.timestamps.daily_timestamp import DailyTimestamp
 
 
-class DailyScheduler:
+class DailyScheduler(TimestampScheduler):
     def __init__(
             self,
             *timestamps: DailyTimestamp,
-            log_on_weekends: bool
+            log_on_weekends: bool,
+            ledger: RunLedger | None = None
     ) -> None:
-        self.timestamps: Tuple[DailyTimestamp, ...] = timestamps
         self.log_on_weekends: bool = log_on_weekends
 
-    def do_send_logs(self) -> bool:
-        if datetime.now(utc).weekday() >= 5 and not self.log_on_weekends:
-            return False
+        super().__init__(*timestamps, ledger=ledger)
+
+    def get_next_fire_time(
+            self,
+            timestamp: DailyTimestamp,
+            after: datetime
+    ) -> datetime:
+        fire_at: datetime = timestamp.get_next_fire_time(after)
 
-        do_send: bool = False
+        while fire_at.weekday() >= 5 and not self.log_on_weekends:
+            fire_at = timestamp.get_next_fire_time(fire_at)
 
-        for timestamp in self.timestamps:
-            if (
-                    timestamp.time.hour == datetime.now(utc).hour
-                    and timestamp.time.minute == datetime.now(utc).minute
-                    and not timestamp.is_logged
-            ):
-                timestamp.is_logged = True
-                do_send = True
+        return fire_at
+
+    def get_previous_fire_time(
+            self,
+            timestamp: DailyTimestamp,
+            before: datetime
+    ) -> datetime:
+        fire_at: datetime = timestamp.get_previous_fire_time(before)
 
-            if timestamp.time > datetime.now(utc).time() or timestamp.time < time(hour=0, minute=1):
-                timestamp.is_logged = False
+        while fire_at.weekday() >= 5 and not self.log_on_weekends:
+            fire_at = timestamp.get_previous_fire_time(fire_at - timedelta(seconds=1))
 
-        return do_send
+        return fire_at
@@ -1,15 +1,18 @@
 import logging
-from datetime import time, datetime
+from datetime import time, datetime, date
 from typing import List, Sequence
 
 from aiogram.types import BufferedInputFile
 from aiogram.utils.i18n import I18n
-from pytz import timezone
+from pytz import utc
 from pyuca import Collator
 from sqlalchemy import select, true, or_
 
 from app.api.v2.enums.account_type import AccountType
+from app.bot.classes.report_renderer import ReportRenderer
+from app.bot.classes.run_ledger import RunLedger
 from app.bot.classes.schedule_task import ScheduleTask
+from app.bot.enums.task_priority import TaskPriority
 from app.bot.notifiers.abstract_notifier import AbstractNotifier
 from app.bot.schedules.abstract_scheduler import AbstractScheduler
 from app.bot.schedules.daily.daily_scheduler import DailyScheduler
@@ -18,12 +21,13 @@ from app.database.database import Database
 from app.database.models import Account, Settings, Role
 from app.services.config import Config
 from app.statistics.models.statistics_report_model import StatisticsReportModel
-from app.statistics.statistics_creator import StatisticsCreator
 
 collator: Collator = Collator()
 
 
 class DailyStatsScheduler(DailyScheduler, AbstractScheduler):
+    collect_timeout: float = 600
+
     def __init__(
             self,
             config: Config,
@@ -31,25 +35,28 @@ class DailyStatsScheduler(DailyScheduler, AbstractScheduler):
             i18n: I18n,
             notifiers: List[AbstractNotifier],
             *,
-            log_on_weekends: bool = False
+            log_on_weekends: bool = False,
+            ledger: RunLedger | None = None,
+            report_renderer: ReportRenderer | None = None
     ) -> None:
         self.database: Database = database
         self.notifiers: List[AbstractNotifier] = notifiers
 
-        self.statistics_creator: StatisticsCreator = StatisticsCreator(database, i18n, timezone(config.timezone))
+        self.report_renderer: ReportRenderer = report_renderer if report_renderer is not None else ReportRenderer()
 
         self.start_time: time = datetime.strptime(config.school_day_start_time, "%H:%M").time()
         self.stats_time: time = datetime.strptime(config.schedule_stats_time, "%H:%M").time()
 
         super().__init__(
             DailyTimestamp(time=self.stats_time),
-            log_on_weekends=log_on_weekends
+            log_on_weekends=log_on_weekends,
+            ledger=ledger
         )
 
     async def collect_tasks(self) -> List[ScheduleTask]:
         schedule_tasks: List[ScheduleTask] = []
 
-        if not self.do_send_logs():
+        if not await self.do_send_logs():
             return schedule_tasks
 
         async with self.database.session_maker() as db:
@@ -69,7 +76,8 @@ class DailyStatsScheduler(DailyScheduler, AbstractScheduler):
                 )
             ).unique().scalars().all()
 
-        statistics_model: StatisticsReportModel = await self.statistics_creator.create_statistics(self.start_time)
+        report_date: date = datetime.now(utc).date()
+        statistics_model: StatisticsReportModel = await self.report_renderer.create_statistics(self.start_time)
 
         for account in accounts:
             for notifier in self.notifiers:
@@ -81,7 +89,9 @@ class DailyStatsScheduler(DailyScheduler, AbstractScheduler):
                         document=BufferedInputFile(
                             statistics_model.xlsx_file,
                             statistics_model.filename
-                        )
+                        ),
+                        priority=TaskPriority.LOW,
+                        key=f"daily_stats:{report_date}"
                     )
                 )
 
@@ -0,0 +1,107 @@
+import logging
+from datetime import time, datetime, date, tzinfo
+from typing import List, Dict, Tuple, Sequence
+from uuid import UUID
+
+from aiogram import html
+from aiogram.utils.i18n import I18n, gettext as _
+from pytz import timezone, utc
+from sqlalchemy import Row
+
+from app.bot.classes.night_digest_buffer import NightDigestBuffer
+from app.bot.classes.run_ledger import RunLedger
+from app.bot.classes.schedule_task import ScheduleTask
+from app.bot.notifiers.abstract_notifier import AbstractNotifier
+from app.bot.schedules.abstract_scheduler import AbstractScheduler
+from app.bot.schedules.daily.daily_scheduler import DailyScheduler
+from app.bot.schedules.timestamps.daily_timestamp import DailyTimestamp
+from app.bot.variations.variation_type import VariationType
+from app.bot.variations.variations import variations
+from app.database.database import Database
+from app.services.config import Config
+
+
+class NightDigestScheduler(DailyScheduler, AbstractScheduler):
+    collect_timeout: float = 120
+
+    def __init__(
+            self,
+            config: Config,
+            database: Database,
+            i18n: I18n,
+            notifiers: List[AbstractNotifier],
+            *,
+            digest_buffer: NightDigestBuffer | None = None,
+            ledger: RunLedger | None = None
+    ) -> None:
+        self.database: Database = database
+        self.i18n: I18n = i18n
+        self.current_timezone: tzinfo = timezone(config.timezone)
+        self.notifiers: List[AbstractNotifier] = notifiers
+        self.digest_buffer: NightDigestBuffer = digest_buffer if digest_buffer is not None else NightDigestBuffer(database)
+        self.taken_entries: List[Tuple[UUID, int]] = []
+
+        # Like the other schedule_* times the digest time is in UTC
+        self.digest_time: time = datetime.strptime(config.schedule_night_digest_time, "%H:%M").time()
+
+        super().__init__(DailyTimestamp(time=self.digest_time), log_on_weekends=True, ledger=ledger)
+
+    async def collect_tasks(self) -> List[ScheduleTask]:
+        schedule_tasks: List[ScheduleTask] = []
+
+        if not await self.do_send_logs():
+            return schedule_tasks
+
+        report_date: date = datetime.now(utc).date()
+
+        # Only the entries EntersScheduler held back for the digest are buffered
+        rows: Sequence[Row] = await self.digest_buffer.get_entries()
+        digests: Dict[int, Tuple[str, List[str]]] = {}
+
+        with self.i18n.context():
+            for entry_id, telegram_id, parent_full_name, student_full_name, passing_time, has_entered in rows:
+                passing_time = passing_time.replace(tzinfo=utc).astimezone(self.current_timezone)
+
+                line: str = variations.get_enter_variation(
+                    False,
+                    has_entered,
+                    VariationType.NIGHT
+                ).format(full_name=html.quote(student_full_name))
+
+                digests.setdefault(telegram_id, (parent_full_name, []))[1].append(
+                    f"<i>{html.quote(passing_time.strftime('%H:%M'))}</i> {line}"
+                )
+                self.taken_entries.append((entry_id, telegram_id))
+
+            for telegram_id, (parent_full_name, lines) in digests.items():
+                message_text: str = "\n".join([_("schedule.night_digest"), *lines])
+
+                for notifier in self.notifiers:
+                    schedule_tasks.append(
+                        ScheduleTask(
+                            notifier.notify,
+                            chat_id=telegram_id,
+                            text=message_text,
+                            key=f"night_digest:{report_date}"
+                        )
+                    )
+
+                    logging.getLogger("scheduler").info(
+                        f"A task has been appended to send {parent_full_name} "
+                        f"a night digest of {len(lines)} entries "
+                        f"by {notifier.notify_method_name}"
+                    )
+
+        return schedule_tasks
+
+    async def commit_collection(self) -> None:
+        await super().commit_collection()
+
+        # Buffered entries are dropped only once their digests have been enqueued
+        await self.digest_buffer.remove(self.taken_entries)
+        self.taken_entries = []
+
+    async def abort_collection(self) -> None:
+        await super().abort_collection()
+
+        self.taken_entries = []
@@ -1,15 +1,23 @@
 import logging
 import random
-from datetime import tzinfo, datetime, time
-from typing import List, Sequence
+from collections import deque
+from datetime import tzinfo, datetime, time, timedelta
+from typing import List, Dict, Tuple, Deque, Type, AsyncIterator
+from uuid import UUID
 
 from aiogram import html
 from aiogram.utils.i18n import I18n
 from pytz import timezone, utc
-from sqlalchemy import select, true, func
-from sqlalchemy.orm import joinedload
+from sqlalchemy import select, update, exists, or_, true, func, cast, String, Select, CTE, Exists
+from sqlalchemy.orm import aliased
 
+from app.bot.classes.cadence_policy import CadencePolicy
+from app.bot.classes.cluster import Cluster
+from app.bot.classes.entry_notification import EntryNotification
+from app.bot.classes.night_digest_buffer import NightDigestBuffer
+from app.bot.classes.outbox import Outbox
 from app.bot.classes.schedule_task import ScheduleTask
+from app.bot.enums.task_priority import TaskPriority
 from app.bot.notifiers.abstract_notifier import AbstractNotifier
 from app.bot.schedules.abstract_scheduler import AbstractScheduler
 from app.bot.variations.variation_type import VariationType
@@ -20,79 +28,277 @@ from app.services.config import Config
 
 
 class EntersScheduler(AbstractScheduler):
+    collect_timeout: float = 30
+
     def __init__(
             self,
             config: Config,
             database: Database,
             i18n: I18n,
-            notifiers: List[AbstractNotifier]
+            notifiers: List[AbstractNotifier],
+            *,
+            cluster: Cluster | None = None,
+            cadence_policy: CadencePolicy | None = None,
+            outbox: Outbox | None = None,
+            digest_buffer: NightDigestBuffer | None = None,
+            cursor_overlap: timedelta = timedelta(minutes=5),
+            coalesce_window: timedelta = timedelta(seconds=60),
+            chunk_size: int = 500
     ) -> None:
         self.database: Database = database
         self.i18n: I18n = i18n
         self.current_timezone: tzinfo = timezone(config.timezone)
         self.notifiers: List[AbstractNotifier] = notifiers
+        self.cluster: Cluster | None = cluster
+        self.outbox: Outbox | None = outbox
+        self.digest_buffer: NightDigestBuffer = digest_buffer if digest_buffer is not None else NightDigestBuffer(database)
+
+        if cadence_policy is None:
+            start_time: datetime = datetime.strptime(config.school_day_start_time, "%H:%M")
+            cadence_policy = CadencePolicy(
+                peak_windows=[((start_time - timedelta(hours=1)).time(), (start_time + timedelta(minutes=30)).time())],
+                current_timezone=self.current_timezone
+            )
+
+        self.cadence_policy: CadencePolicy = cadence_policy
+        self.found_work: bool = False
+
+        now: datetime = datetime.now(utc)
+
+        self.cursor: datetime = datetime.combine(now.date(), time(), tzinfo=utc)
+        self.shard: Tuple[int, int] = (0, 1)
+        self.cursor_overlap: timedelta = cursor_overlap
+        self.coalesce_window: timedelta = coalesce_window
+        self.release_times: Deque[datetime] = deque()
+        self.chunk_size: int = chunk_size
 
     async def collect_tasks(self) -> List[ScheduleTask]:
         schedule_tasks: List[ScheduleTask] = []
 
         async with self.database.session_maker() as db:
             now: datetime = datetime.now(utc)
+            day_start: datetime = datetime.combine(now.date(), time(), tzinfo=utc)
+
+            if self.cluster is not None and (self.cluster.shard_index, self.cluster.shard_count) != self.shard:
+                # Unclaimed entries of a reassigned shard can be older than this instance's cursor
+                self.shard = (self.cluster.shard_index, self.cluster.shard_count)
+                self.cursor = day_start
 
-            entries: Sequence[Entry] = (
-                await db.execute(
-                    select(Entry)
+            pending: Select = (
+                select(Entry.id)
+                .filter(
+                    Entry.notified_at.is_(None),
+                    Entry.passing_time >= day_start,
+                    Entry.passing_time < day_start + timedelta(days=1)
+                )
+                .join(Student)
+                .join(StudentsParents)
+                .join(Account)
+                .filter(Account.telegram_id.is_not(None))
+                .join(Settings)
+                .filter(Settings.send_bot_messages.is_(true()))
+            )
+
+            if self.cluster is not None and self.cluster.shard_count > 1:
+                pending = pending.filter(
+                    func.abs(func.hashtext(cast(Entry.student_id, String)) % self.cluster.shard_count)
+                    == self.cluster.shard_index
+                )
+
+            candidates: Select = (
+                pending
+                .filter(Entry.created_at >= self.cursor - self.cursor_overlap)
+                .order_by(Entry.created_at)
+                .limit(self.chunk_size)
+                .with_for_update(of=Entry, skip_locked=True)
+            )
+            held: Select | None = None
+
+            if self.coalesce_window > timedelta():
+                # Fresh entries of a student who was notified within the window are held back and merged on a later
+                # claim, backlog entries are never held so the cursor cannot move past them
+                notified_entry: Type[Entry] = aliased(Entry)
+                is_recently_notified: Exists = exists(
+                    select(notified_entry.id)
                     .filter(
-                        Entry.notified_at.is_(None),
-                        func.date(Entry.passing_time) == now.date()
+                        notified_entry.student_id == Entry.student_id,
+                        notified_entry.notified_at >= now - self.coalesce_window
                     )
-                    .join(Student)
-                    .join(StudentsParents)
-                    .join(Account)
-                    .filter(Account.telegram_id.is_not(None))
-                    .join(Settings)
-                    .filter(Settings.send_bot_messages.is_(true()))
-                    .options(
-                        joinedload(Entry.student).joinedload(Student.parents).joinedload(Account.settings)
+                )
+                candidates = candidates.filter(
+                    or_(
+                        Entry.created_at < now - self.coalesce_window,
+                        ~is_recently_notified
                     )
                 )
-            ).unique().scalars().all()
+                held = pending.filter(Entry.created_at >= now - self.coalesce_window, is_recently_notified)
+
+            # Entries are claimed and returned in one statement, so concurrent replicas never take the same rows
+            claimed: CTE = (
+                update(Entry)
+                .where(Entry.id.in_(candidates), Entry.notified_at.is_(None))
+                .values(notified_at=now)
+                .returning(Entry.id, Entry.created_at, Entry.passing_time, Entry.has_entered, Entry.student_id)
+                .cte("claimed_entries")
+            )
+
+            query: Select = (
+                select(
+                    claimed.c.id,
+                    claimed.c.created_at,
+                    claimed.c.passing_time,
+                    claimed.c.has_entered,
+                    claimed.c.student_id,
+                    Student.full_name,
+                    Account.telegram_id,
+                    Account.full_name,
+                    Settings.allow_bot_variations,
+                    Settings.night_digest
+                )
+                .select_from(claimed)
+                .join(Student, Student.id == claimed.c.student_id)
+                .join(StudentsParents)
+                .join(Account)
+                .filter(Account.telegram_id.is_not(None))
+                .join(Settings)
+                .filter(Settings.send_bot_messages.is_(true()))
+            )
+
+            notifications: List[EntryNotification] = [
+                EntryNotification(*row) for row in (await db.execute(query)).all()
+            ]
+            self.found_work = len(notifications) > 0
+            cursor: datetime = self.cursor
+
+            for notification in notifications:
+                created_at: datetime = notification.created_at
+
+                if created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=utc)
+
+                cursor = max(cursor, created_at)
+
+            latest_notifications: Dict[Tuple[UUID, int], EntryNotification] = {}
+
+            for notification in notifications:
+                latest_key: Tuple[UUID, int] = (notification.student_id, notification.telegram_id)
+                latest: EntryNotification | None = latest_notifications.get(latest_key)
+
+                if latest is None or notification.passing_time > latest.passing_time:
+                    latest_notifications[latest_key] = notification
+
+            # A poll is only brought forward when entries are actually waiting for their coalesce window to end
+            if held is not None and await db.scalar(select(held.exists())):
+                self.release_times.append(now + self.coalesce_window)
+
+            rendered_messages: Dict[Tuple[UUID, bool], str] = {}
+            held_notifications: List[EntryNotification] = []
 
             with self.i18n.context():
-                for entry in entries:
-                    entry.notified_at = now
-                    passing_time: datetime = entry.passing_time.replace(tzinfo=utc).astimezone(self.current_timezone)
-
-                    for parent in entry.student.parents:
-                        if parent.telegram_id is None:
-                            continue
-
-                        message_text: str = variations.get_enter_variation(
-                            parent.settings.allow_bot_variations if parent.settings is not None else False,
-                            entry.has_entered,
-                            VariationType.get_variation_type(passing_time)
-                        ).format(full_name=html.quote(entry.student.full_name))
-
-                        if not (0 <= (entry.created_at - entry.passing_time).seconds <= 60):
-                            message_text = f"<i>{html.quote(passing_time.strftime('%H:%M'))}</i>\n{message_text}"
-
-                        if entry.passing_time.time() > time(hour=6, minute=30) and random.random() < 0.15:
-                            message_text += "\n\nШановні батьки! Нагадуємо, що навчання в ліцеї починається о 8:30, але всі учні мають бути присутні о 8:15. Дякуємо за розуміння!"
-
-                        for notifier in self.notifiers:
-                            schedule_tasks.append(
-                                ScheduleTask(
-                                    notifier.notify,
-                                    chat_id=parent.telegram_id,
-                                    text=message_text
-                                )
-                            )
+                for notification in latest_notifications.values():
+                    if notification.night_digest and self.is_night(notification):
+                        # Night entries of digest subscribers are sent by NightDigestScheduler in the morning
+                        held_notifications.append(notification)
+                        continue
 
-                            logging.getLogger("scheduler").info(
-                                f"A task has been appended to send {parent.full_name} "
-                                f"an entry details of {entry.student.full_name} "
-                                f"by {notifier.notify_method_name}"
+                    render_key: Tuple[UUID, bool] = (notification.entry_id, notification.allow_variations)
+                    message_text: str | None = rendered_messages.get(render_key)
+
+                    if message_text is None:
+                        message_text = rendered_messages[render_key] = self.render_message(notification)
+
+                    for notifier in self.notifiers:
+                        schedule_tasks.append(
+                            ScheduleTask(
+                                notifier.notify,
+                                chat_id=notification.telegram_id,
+                                text=message_text,
+                                priority=TaskPriority.HIGH,
+                                origin_time=notification.created_at,
+                                key=f"entry:{notification.entry_id}"
                             )
+                        )
+
+                        logging.getLogger("scheduler").info(
+                            f"A task has been appended to send {notification.parent_full_name} "
+                            f"an entry details of {notification.student_full_name} "
+                            f"by {notifier.notify_method_name}"
+                        )
+
+                if self.outbox is not None:
+                    # Rows are written with notified_at, so a crash before sending cannot lose the notification
+                    await self.outbox.add(db, schedule_tasks)
 
+                await self.digest_buffer.add(db, held_notifications)
                 await db.commit()
 
+            self.cursor = cursor
+
         return schedule_tasks
+
+    def get_local_passing_time(
+            self,
+            notification: EntryNotification
+    ) -> datetime:
+        return notification.passing_time.replace(tzinfo=utc).astimezone(self.current_timezone)
+
+    def is_night(
+            self,
+            notification: EntryNotification
+    ) -> bool:
+        return VariationType.get_variation_type(self.get_local_passing_time(notification)) == VariationType.NIGHT
+
+    async def stream_tasks(self) -> AsyncIterator[List[ScheduleTask]]:
+        found_work: bool = False
+
+        # Every chunk is committed and handed to the sender before the next one is claimed
+        while True:
+            schedule_tasks: List[ScheduleTask] = await self.collect_tasks()
+
+            if not self.found_work:
+                break
+
+            found_work = True
+            yield schedule_tasks
+
+        self.found_work = found_work
+
+    async def abort_collection(self) -> None:
+        # A failed collection must not keep the cadence at its busy delay
+        self.found_work = False
+
+    def render_message(
+            self,
+            notification: EntryNotification
+    ) -> str:
+        # Seeding by the entry keeps every parent of the student on the same variation and reminder
+        randomizer: random.Random = random.Random(str(notification.entry_id))
+        show_reminder: bool = randomizer.random() < 0.15
+        passing_time: datetime = self.get_local_passing_time(notification)
+
+        message_text: str = variations.get_enter_variation(
+            notification.allow_variations,
+            notification.has_entered,
+            VariationType.get_variation_type(passing_time),
+            randomizer
+        ).format(full_name=html.quote(notification.student_full_name))
+
+        if not (0 <= (notification.created_at - notification.passing_time).seconds <= 60):
+            message_text = f"<i>{html.quote(passing_time.strftime('%H:%M'))}</i>\n{message_text}"
+
+        if notification.passing_time.time() > time(hour=6, minute=30) and show_reminder:
+            message_text += "\n\nШановні батьки! Нагадуємо, що навчання в ліцеї починається о 8:30, але всі учні мають бути присутні о 8:15. Дякуємо за розуміння!"
+
+        return message_text
+
+    def get_collect_delay(self) -> float:
+        delay: float = self.cadence_policy.get_delay(self.found_work)
+        now: datetime = datetime.now(utc)
+
+        while len(self.release_times) > 0 and self.release_times[0] <= now:
+            self.release_times.popleft()
+
+        if len(self.release_times) > 0:
+            delay = min(delay, (self.release_times[0] - now).total_seconds())
+
+        return delay
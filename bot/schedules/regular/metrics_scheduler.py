@@ -8,6 +8,7 @@ from pytz import timezone, utc
 from sqlalchemy import select, true
 
 from app.bot.classes.schedule_task import ScheduleTask
+from app.bot.enums.task_priority import TaskPriority
 from app.bot.notifiers.abstract_notifier import AbstractNotifier
 from app.bot.schedules.abstract_scheduler import AbstractScheduler
 from app.database.database import Database
@@ -16,6 +17,9 @@ from app.services.config import Config
 
 
 class MetricsScheduler(AbstractScheduler):
+    collect_timeout: float = 30
+    is_singleton: bool = True
+
     def __init__(
             self,
             config: Config,
@@ -108,7 +112,8 @@ class MetricsScheduler(AbstractScheduler):
                         ScheduleTask(
                             notifier.notify,
                             chat_id=administrator.telegram_id,
-                            text=message_text
+                            text=message_text,
+                            priority=TaskPriority.HIGH
                         )
                     )
 
@@ -0,0 +1,131 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Tuple, List
+
+from pytz import utc
+
+from app.bot.classes.run_ledger import RunLedger
+from app.bot.schedules.abstract_scheduler import AbstractScheduler
+from app.bot.schedules.timestamps.daily_timestamp import DailyTimestamp
+from app.bot.schedules.timestamps.weekly_timestamp import WeeklyTimestamp
+
+
+class TimestampScheduler(AbstractScheduler):
+    is_singleton: bool = True
+    retry_delay: timedelta = timedelta(minutes=1)
+
+    def __init__(
+            self,
+            *timestamps: DailyTimestamp | WeeklyTimestamp,
+            ledger: RunLedger | None = None
+    ) -> None:
+        self.timestamps: Tuple[DailyTimestamp | WeeklyTimestamp, ...] = timestamps
+        self.ledger: RunLedger = ledger if ledger is not None else RunLedger(self.database)
+        self.is_resumed: bool = False
+        self.claimed_timestamps: List[DailyTimestamp | WeeklyTimestamp] = []
+        self.retry_at: datetime | None = None
+
+        now: datetime = datetime.now(utc)
+
+        for timestamp in self.timestamps:
+            timestamp.fire_at = self.get_next_fire_time(timestamp, now)
+
+    def get_next_fire_time(
+            self,
+            timestamp: DailyTimestamp | WeeklyTimestamp,
+            after: datetime
+    ) -> datetime:
+        return timestamp.get_next_fire_time(after)
+
+    def get_previous_fire_time(
+            self,
+            timestamp: DailyTimestamp | WeeklyTimestamp,
+            before: datetime
+    ) -> datetime:
+        return timestamp.get_previous_fire_time(before)
+
+    def get_collect_delay(self) -> float:
+        fire_at: datetime = min(timestamp.fire_at for timestamp in self.timestamps)
+
+        if self.retry_at is not None:
+            fire_at = max(fire_at, self.retry_at)
+
+        return max(0.0, (fire_at - datetime.now(utc)).total_seconds())
+
+    async def resume(
+            self,
+            now: datetime
+    ) -> None:
+        for timestamp in self.timestamps:
+            last_run: datetime | None = await self.ledger.get_last_run(self.get_ledger_key(timestamp))
+            previous_fire_at: datetime = self.get_previous_fire_time(timestamp, now)
+
+            if last_run is not None and last_run < previous_fire_at:
+                timestamp.fire_at = previous_fire_at
+
+        self.is_resumed = True
+
+    async def do_send_logs(self) -> bool:
+        now: datetime = datetime.now(utc)
+
+        if not self.is_resumed:
+            await self.resume(now)
+
+        if self.retry_at is not None and self.retry_at > now:
+            return False
+
+        self.retry_at = None
+        lease_time: timedelta = timedelta(seconds=2 * (self.collect_timeout or 60))
+
+        for timestamp in self.timestamps:
+            if timestamp.fire_at > now:
+                continue
+
+            if now - timestamp.fire_at > self.ledger.grace:
+                logging.getLogger("scheduler").warning(
+                    f"{type(self).__name__} skipped the run of {timestamp.fire_at} as it is out of the grace window"
+                )
+                timestamp.fire_at = self.get_next_fire_time(timestamp, now)
+                continue
+
+            ledger_key: str = self.get_ledger_key(timestamp)
+
+            if await self.ledger.claim(ledger_key, timestamp.fire_at, lease_time):
+                self.claimed_timestamps.append(timestamp)
+                continue
+
+            last_run: datetime | None = await self.ledger.get_last_run(ledger_key)
+
+            # Another instance holds the claim, the run is checked again once it has finished or its lease expired
+            if last_run is None or last_run < timestamp.fire_at:
+                self.retry_at = now + self.retry_delay
+                continue
+
+            timestamp.fire_at = self.get_next_fire_time(timestamp, now)
+
+        return len(self.claimed_timestamps) > 0
+
+    async def commit_collection(self) -> None:
+        now: datetime = datetime.now(utc)
+
+        # The run is recorded only after its tasks have been handed over to the task manager
+        for timestamp in self.claimed_timestamps:
+            await self.ledger.set_last_run(self.get_ledger_key(timestamp), timestamp.fire_at)
+            timestamp.fire_at = self.get_next_fire_time(timestamp, now)
+
+        self.claimed_timestamps = []
+
+    async def abort_collection(self) -> None:
+        for timestamp in self.claimed_timestamps:
+            await self.ledger.release(self.get_ledger_key(timestamp))
+
+        if self.claimed_timestamps:
+            self.retry_at = datetime.now(utc) + self.retry_delay
+
+        self.claimed_timestamps = []
+
+    def get_ledger_key(
+            self,
+            timestamp: DailyTimestamp | WeeklyTimestamp
+    ) -> str:
+        return f"{type(self).__name__}:{timestamp.key}"
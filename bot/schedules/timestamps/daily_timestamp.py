@@ -1,8 +1,34 @@
-from datetime import time
+from datetime import time, datetime, timedelta
 
 from pydantic import BaseModel
 
 
 class DailyTimestamp(BaseModel):
     time: time
-    is_logged: bool = False
+    fire_at: datetime | None = None
+
+    @property
+    def key(self) -> str:
+        return self.time.strftime("%H:%M")
+
+    def get_next_fire_time(
+            self,
+            after: datetime
+    ) -> datetime:
+        fire_time: datetime = datetime.combine(after.date(), self.time, tzinfo=after.tzinfo)
+
+        if fire_time <= after:
+            fire_time += timedelta(days=1)
+
+        return fire_time
+
+    def get_previous_fire_time(
+            self,
+            before: datetime
+    ) -> datetime:
+        fire_time: datetime = datetime.combine(before.date(), self.time, tzinfo=before.tzinfo)
+
+        if fire_time > before:
+            fire_time -= timedelta(days=1)
+
+        return fire_time
@@ -1,4 +1,4 @@
-from datetime import time
+from datetime import time, datetime, timedelta
 
 from pydantic import BaseModel
 
@@ -6,4 +6,38 @@ from pydantic import BaseModel
 class WeeklyTimestamp(BaseModel):
     weekday: int
     time: time
-    is_logged: bool = False
+    fire_at: datetime | None = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.weekday}:{self.time.strftime('%H:%M')}"
+
+    def get_next_fire_time(
+            self,
+            after: datetime
+    ) -> datetime:
+        fire_time: datetime = datetime.combine(
+            after.date() + timedelta(days=(self.weekday - after.weekday()) % 7),
+            self.time,
+            tzinfo=after.tzinfo
+        )
+
+        if fire_time <= after:
+            fire_time += timedelta(days=7)
+
+        return fire_time
+
+    def get_previous_fire_time(
+            self,
+            before: datetime
+    ) -> datetime:
+        fire_time: datetime = datetime.combine(
+            before.date() - timedelta(days=(before.weekday() - self.weekday) % 7),
+            self.time,
+            tzinfo=before.tzinfo
+        )
+
+        if fire_time > before:
+            fire_time -= timedelta(days=7)
+
+        return fire_time
@@ -4,11 +4,14 @@ from typing import List, Sequence
 
 from aiogram.types import BufferedInputFile
 from aiogram.utils.i18n import I18n
-from pytz import timezone, utc
+from pytz import utc
 from sqlalchemy import select, true, or_
 
+from app.bot.classes.report_renderer import ReportRenderer
+from app.bot.classes.run_ledger import RunLedger
 from app.bot.classes.schedule_task import ScheduleTask
 from app.bot.enums.account_type import AccountType
+from app.bot.enums.task_priority import TaskPriority
 from app.bot.notifiers.abstract_notifier import AbstractNotifier
 from app.bot.schedules.abstract_scheduler import AbstractScheduler
 from app.bot.schedules.timestamps.weekly_timestamp import WeeklyTimestamp
@@ -16,32 +19,36 @@ from app.bot.schedules.weekly.weekly_scheduler import WeeklyScheduler
 from app.database.database import Database
 from app.database.models import Account, Settings, Role
 from app.services.config import Config
-from app.statistics.antirating_creator import AntiRatingCreator
 from app.statistics.models.antirating_report_model import AntiRatingReportModel
 
 
 class WeeklyAntiRatingScheduler(WeeklyScheduler, AbstractScheduler):
+    collect_timeout: float = 600
+
     def __init__(
             self,
             config: Config,
             database: Database,
             i18n: I18n,
-            notifiers: List[AbstractNotifier]
+            notifiers: List[AbstractNotifier],
+            *,
+            ledger: RunLedger | None = None,
+            report_renderer: ReportRenderer | None = None
     ) -> None:
         self.database: Database = database
         self.notifiers: List[AbstractNotifier] = notifiers
 
-        self.antirating_creator: AntiRatingCreator = AntiRatingCreator(database, i18n, timezone(config.timezone))
+        self.report_renderer: ReportRenderer = report_renderer if report_renderer is not None else ReportRenderer()
 
         self.start_time: time = datetime.strptime(config.school_day_start_time, "%H:%M").time()
         self.antirating_time: time = datetime.strptime(config.schedule_antirating_time, "%H:%M").time()
 
-        super().__init__(WeeklyTimestamp(weekday=4, time=self.antirating_time))
+        super().__init__(WeeklyTimestamp(weekday=4, time=self.antirating_time), ledger=ledger)
 
     async def collect_tasks(self) -> List[ScheduleTask]:
         schedule_tasks: List[ScheduleTask] = []
 
-        if not self.do_send_logs():
+        if not await self.do_send_logs():
             return schedule_tasks
 
         async with self.database.session_maker() as db:
@@ -68,7 +75,7 @@ class WeeklyAntiRatingScheduler(WeeklyScheduler, AbstractScheduler):
             for index in range(weekday, -1, -1)
         ]
 
-        antirating_model: AntiRatingReportModel = await self.antirating_creator.create_antirating(
+        antirating_model: AntiRatingReportModel = await self.report_renderer.create_antirating(
             self.start_time,
             10,
             date_range
@@ -84,7 +91,9 @@ class WeeklyAntiRatingScheduler(WeeklyScheduler, AbstractScheduler):
                         document=BufferedInputFile(
                             antirating_model.xlsx_file,
                             antirating_model.filename
-                        )
+                        ),
+                        priority=TaskPriority.LOW,
+                        key=f"weekly_antirating:{date_range[0]}"
                     )
                 )
 
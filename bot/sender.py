@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import sys
+from typing import List
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.enums import ParseMode
+from redis.asyncio import Redis
+
+from app.bot.classes.deduplicator import Deduplicator
+from app.bot.classes.outbox import Outbox
+from app.bot.classes.rate_limiter import RateLimiter
+from app.bot.classes.scheduler_metrics import SchedulerMetrics
+from app.bot.classes.schema_migrator import SchemaMigrator
+from app.bot.classes.task_manager import TaskManager
+from app.bot.middlewares.rate_limit import RateLimitMiddleware
+from app.bot.migrations import create_migrations
+from app.bot.notifiers.abstract_notifier import AbstractNotifier
+from app.bot.notifiers.telegram_notifier import TelegramNotifier
+from app.database.database import Database, create_db
+from app.services.config import Config
+
+config: Config = Config(_env_file=".env")
+
+bot: Bot = Bot(
+    token=config.telegram_token.get_secret_value(),
+    default=DefaultBotProperties(
+        parse_mode=ParseMode.HTML
+    )
+)
+
+
+async def main() -> None:
+    redis: Redis | None = None
+
+    if config.redis_storage_dsn is not None:
+        redis = Redis.from_url(str(config.redis_storage_dsn))
+
+    bot.session.middleware(RateLimitMiddleware(RateLimiter(redis)))
+
+    database: Database = create_db(str(config.postgresql_dsn))
+    await SchemaMigrator(database, *create_migrations(config)).migrate()
+
+    notifiers: List[AbstractNotifier] = [
+        TelegramNotifier(bot)
+    ]
+
+    scheduler_metrics: SchedulerMetrics = SchedulerMetrics()
+    scheduler_metrics.start_server(config.sender_metrics_port)
+
+    task_manager: TaskManager = TaskManager(
+        10,
+        metrics=scheduler_metrics,
+        deduplicator=Deduplicator(redis),
+        outbox=Outbox(database, notifiers)
+    )
+
+    task_manager.start()
+    await asyncio.gather(task_manager.consumer, *task_manager.workers)
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(levelname)s %(asctime)s - %(message)s",
+        datefmt="%d-%m-%y %H:%M:%S"
+    )
+
+    asyncio.run(main())
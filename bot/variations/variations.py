@@ -82,12 +82,13 @@ class Variations:
             self,
             allow_variations: bool,
             has_entered: bool,
-            variation_type: VariationType
+            variation_type: VariationType,
+            randomizer: random.Random | None = None
     ) -> str:
         if not allow_variations:
             return self.base_enter if has_entered else self.base_exit
 
-        return random.choice(self.enter_variations[has_entered][variation_type])
+        return (randomizer or random).choice(self.enter_variations[has_entered][variation_type])
 
     def get_log_variation(
             self,